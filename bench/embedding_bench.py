@@ -0,0 +1,128 @@
+# embedding_bench.py
+# 임베딩 백엔드 비교: 기준(hf, 원본 bge-m3) 대비 후보(onnx/int8)의
+#   - 정합성: docs/ 코퍼스 chunk에 대한 top-k 검색 결과 겹침(overlap@k), 같은 문서 벡터 간 코사인 유사도
+#   - 성능: 단일 질의 지연(p50/p95), 배치 크기별 처리량(chunk/s)
+# 을 JSON으로 출력.
+#
+# 사용 예:
+#   python3 -m bench.embedding_bench --candidate-model models/bge-m3-onnx-int8 --threads 4
+#   python3 -m bench.embedding_bench --skip-parity --batch-sizes 1 8 32
+#
+# 측정 결과: 아직 실제 bge-m3(hf) 대비 onnx/int8로 측정한 결과 없음.
+#   이 스크립트는 작은 합성 ONNX 모델로 실행 경로(토크나이저/세션/배치/JSON 출력)만 확인했음.
+#   bge-m3 가중치, optimum(export), sentence-transformers, langchain_community/Chroma/PyPDF가 있는 환경에서
+#   실행한 뒤 overlap@k, doc_cosine, p50/p95, chunks_per_s를 여기에 기록하고, 그 전에는 EMBED_BACKEND=onnx를 기본값으로 바꾸지 말 것.
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+def load_corpus(pdf_paths: list[str], limit: int) -> list[str]:
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)  # rag.indexing과 같은 설정
+    texts = []
+    for path in pdf_paths:
+        texts.extend(d.page_content for d in splitter.split_documents(PyPDFLoader(path).load()))
+    return texts[:limit] if limit else texts
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(query_vectors @ doc_vectors.T), axis=1)[:, :k]
+
+def parity(reference, candidate, texts: list[str], queries: list[str], k: int) -> dict:
+    ref_docs = np.array(reference.embed_documents(texts))
+    cand_docs = np.array(candidate.embed_documents(texts))
+    ref_q = np.array([reference.embed_query(q) for q in queries])
+    cand_q = np.array([candidate.embed_query(q) for q in queries])
+
+    def normalize(v):
+        return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+    ref_docs, cand_docs, ref_q, cand_q = map(normalize, (ref_docs, cand_docs, ref_q, cand_q))
+    ref_top = top_k(ref_docs, ref_q, k)
+    cand_top = top_k(cand_docs, cand_q, k)
+    overlaps = [len(set(a) & set(b)) / k for a, b in zip(ref_top, cand_top)]
+    # 같은 모델의 다른 실행 방식일 때만 벡터를 직접 비교할 수 있음
+    cosine = (ref_docs * cand_docs).sum(axis=1) if ref_docs.shape == cand_docs.shape else None
+    return {
+        "queries": len(queries),
+        "docs": len(texts),
+        f"overlap@{k}_mean": round(float(np.mean(overlaps)), 3),
+        f"overlap@{k}_min": round(float(np.min(overlaps)), 3),
+        "top1_agreement": round(float(np.mean(ref_top[:, 0] == cand_top[:, 0])), 3),
+        "doc_cosine_mean": round(float(cosine.mean()), 4) if cosine is not None else None,
+        "doc_cosine_min": round(float(cosine.min()), 4) if cosine is not None else None,
+    }
+
+def throughput(model, texts: list[str], queries: list[str], batch_sizes: list[int], repeat: int) -> dict:
+    model.embed_query(queries[0])  # 워밍업
+    latencies = []
+    for _ in range(repeat):
+        for q in queries:
+            start = time.perf_counter()
+            model.embed_query(q)
+            latencies.append((time.perf_counter() - start) * 1000)
+    result = {
+        "query_p50_ms": round(percentile(latencies, 50), 2),
+        "query_p95_ms": round(percentile(latencies, 95), 2),
+        "batches": {},
+    }
+    for size in batch_sizes:
+        if hasattr(model, "batch_size"):
+            model.batch_size = size
+        start = time.perf_counter()
+        for i in range(0, len(texts), size):
+            model.embed_documents(texts[i:i + size])
+        elapsed = time.perf_counter() - start
+        result["batches"][str(size)] = {"chunks_per_s": round(len(texts) / elapsed, 1), "total_s": round(elapsed, 2)}
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 백엔드 정합성/성능 비교")
+    parser.add_argument("--reference-backend", default="hf")
+    parser.add_argument("--reference-model", default="BAAI/bge-m3")
+    parser.add_argument("--candidate-backend", default="onnx")
+    parser.add_argument("--candidate-model", default="models/bge-m3-onnx-int8")
+    parser.add_argument("--threads", type=int, help="후보 ONNX intra-op 스레드 수 (EMBED_NUM_THREADS)")
+    parser.add_argument("--pdfs", nargs="*")
+    parser.add_argument("--limit", type=int, default=0, help="사용할 최대 chunk 수 (0: 전체)")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 16, 32])
+    parser.add_argument("--repeat", type=int, default=3, help="단일 질의 지연 측정 반복 횟수")
+    parser.add_argument("--skip-parity", action="store_true", help="기준 모델 로드/비교 생략 (성능만 측정)")
+    args = parser.parse_args()
+
+    if args.threads:
+        os.environ["EMBED_NUM_THREADS"] = str(args.threads)
+    # rag.embeddings는 import 시 설정을 읽고 기본 임베딩을 만들므로 환경변수 설정 뒤에 import.
+    # 비교 대상은 아래에서 직접 만들기 때문에 모듈 기본값은 가벼운 stub으로
+    os.environ["EMBED_BACKEND"] = "stub"
+    from rag.embeddings import build_embeddings
+    from rag.indexing import DEFAULT_PDFS, PROBE_QUERIES
+
+    texts = load_corpus(args.pdfs or DEFAULT_PDFS, args.limit)
+    # 질의: 대표 질의 + 코퍼스 chunk 앞부분(문서 자신을 찾아야 하는 질의)
+    queries = PROBE_QUERIES + [t[:200] for t in texts[::max(1, len(texts) // 24)]]
+    print(f"코퍼스 {len(texts)} chunk, 질의 {len(queries)}개", file=sys.stderr)
+
+    candidate = build_embeddings(args.candidate_backend, args.candidate_model)
+    result = {"candidate": {"backend": args.candidate_backend, "model": args.candidate_model}}
+    if not args.skip_parity:
+        reference = build_embeddings(args.reference_backend, args.reference_model)
+        result["reference"] = {"backend": args.reference_backend, "model": args.reference_model}
+        result["parity"] = parity(reference, candidate, texts, queries, args.k)
+        result["reference"]["perf"] = throughput(reference, texts, queries, args.batch_sizes, args.repeat)
+        del reference
+    result["candidate"]["perf"] = throughput(candidate, texts, queries, args.batch_sizes, args.repeat)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
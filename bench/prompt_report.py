@@ -0,0 +1,106 @@
+# prompt_report.py
+# 플랜 생성 프롬프트의 공유 접두(prefix) 비율 리포트.
+#   - log 모드: 서버 요청 로그(JSON 한 줄씩)의 llm span에서 프롬프트/완성/접두 토큰 수 집계
+#   - render 모드: DB의 사용자 N명에 대해 실제 프롬프트를 만들어, 앞서 만든 프롬프트들과 글자 단위로 공통인 접두 길이
+#     (prefix caching 서빙 스택이 재사용할 수 있는 분량)를 측정
+#
+# 사용 예:
+#   uvicorn main:app ... | tee server.log  →  python3 -m bench.prompt_report --log server.log
+#   python3 -m bench.prompt_report --database-url sqlite:///bulk.db --users 50
+import os
+import sys
+import json
+import argparse
+import datetime
+from collections import Counter
+
+def report_from_log(lines) -> dict:
+    requests = 0
+    prompt = completion = prefix = 0
+    versions = Counter()
+    for line in lines:
+        line = line.strip()
+        if not line.startswith("{"):
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        for s in entry.get("spans", []):
+            if s.get("name") != "llm":
+                continue
+            requests += 1
+            prompt += s.get("prompt_tokens") or 0
+            completion += s.get("completion_tokens") or 0
+            prefix += s.get("prefix_tokens") or 0
+            versions[s.get("catalog_version")] += 1
+    return {
+        "llm_requests": requests,
+        "prompt_tokens_mean": round(prompt / requests, 1) if requests else None,
+        "completion_tokens_mean": round(completion / requests, 1) if requests else None,
+        "prefix_tokens_mean": round(prefix / requests, 1) if requests else None,
+        "shared_prefix_fraction": round(prefix / prompt, 3) if prompt else None,
+        "catalog_versions": dict(versions),
+    }
+
+def report_from_render(users: int) -> dict:
+    # routers.llm은 import 시 LLM/임베딩을 만들므로 로컬 스텁으로
+    os.environ.setdefault("LLM_BACKEND", "stub")
+    os.environ.setdefault("EMBED_BACKEND", "stub")
+    from db_work.database import SessionLocal
+    from db_work.models import User
+    from rag.chat_models import estimate_tokens
+    from routers.llm import PROMPT, build_plan_inputs
+
+    target = (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+    db = SessionLocal()
+    try:
+        prompts = []
+        system_chars = []
+        for user in db.query(User).order_by(User.id).limit(users):
+            inputs = build_plan_inputs(db, user, None)
+            inputs["context"] = ""  # RAG 컨텍스트는 사용자 메시지에만 들어가므로 접두 측정에는 영향 없음
+            messages = PROMPT.format_messages(**inputs, date=target)
+            system_chars.append(len(messages[0].content))
+            prompts.append("\n".join(f"{m.type}\n{m.content}" for m in messages))
+    finally:
+        db.close()
+    if not prompts:
+        raise SystemExit("사용자가 없습니다. 먼저 db_work.generate_bulk_data 등으로 데이터를 생성하세요.")
+
+    # 각 프롬프트가 이전 프롬프트들과 공유하는 가장 긴 접두 (첫 요청은 캐시가 비어 있으므로 제외)
+    reused = []
+    for i in range(1, len(prompts)):
+        best = max(len(os.path.commonprefix([prompts[i], prompts[j]])) for j in range(i))
+        reused.append(best / len(prompts[i]))
+    lengths = [len(p) for p in prompts]
+    return {
+        "prompts": len(prompts),
+        "prompt_chars_mean": round(sum(lengths) / len(lengths), 1),
+        "prompt_tokens_est_mean": round(sum(estimate_tokens(p) for p in prompts) / len(prompts), 1),
+        "system_fraction_mean": round(sum(c / l for c, l in zip(system_chars, lengths)) / len(lengths), 3),
+        "reusable_prefix_fraction_mean": round(sum(reused) / len(reused), 3) if reused else None,
+        "reusable_prefix_fraction_min": round(min(reused), 3) if reused else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="프롬프트 공유 접두 비율 리포트")
+    parser.add_argument("--log", help="서버 요청 로그 파일 ('-': stdin)")
+    parser.add_argument("--database-url", help="render 모드: 프롬프트를 만들 DB")
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.log:
+        if args.log == "-":
+            result = report_from_log(sys.stdin)
+        else:
+            with open(args.log) as f:
+                result = report_from_log(f)
+    else:
+        if args.database_url:
+            os.environ["DATABASE_URL"] = args.database_url
+        result = report_from_render(args.users)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# run_bench.py
+# 전체 API 부하 벤치마크.
+# 로컬 DB(기본 SQLite)를 시드하고 스텁 임베딩/스텁 LLM으로 uvicorn을 띄운 뒤,
+# 혼합 워크로드(로그인, 기록 조회, PATCH, 차트 조회, 플랜 생성)를 동시성 단계별로 실행하여
+# 엔드포인트별 처리량과 p50/p95/p99 지연시간을 JSON으로 출력하고 기준값과 비교.
+#
+# 사용 예:
+#   python3 -m bench.run_bench --concurrency 1 8 32 --duration 20 --output bench_output.json
+#   python3 -m bench.run_bench --save-baseline bench/baseline.json
+#   python3 -m bench.run_bench --baseline bench/baseline.json --tolerance 0.2
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import datetime
+import tempfile
+import subprocess
+from collections import defaultdict
+
+import httpx
+
+from .seed import seed_bench_db, BENCH_EMAIL, BENCH_PASSWORD
+
+# (엔드포인트 이름, 가중치)
+WORKLOAD = [
+    ("GET /exercise/records", 40),
+    ("PATCH /exercise/records/{record_id}", 20),
+    ("GET /exercise/body_composition/weekly", 20),
+    ("GET /users/me", 8),
+    ("POST /token", 4),
+    ("POST /plan/generate-and-save", 8),
+]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env},
+        stdout=sys.stderr,  # 서버 로그가 결과 JSON(stdout)에 섞이지 않도록
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/openapi.json", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError("server did not start in time")
+
+class Client:
+    """
+    가상 사용자 하나. 로그인 후 가중치에 따라 요청을 반복.
+    """
+
+    def __init__(self, http: httpx.AsyncClient, user_id: int, rng: random.Random, samples: dict, days: int):
+        self.http = http
+        self.user_id = user_id
+        self.rng = rng
+        self.samples = samples
+        self.days = days
+        self.headers = {}
+        self.record_ids = []
+
+    async def timed(self, name, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            r = await self.http.request(method, url, **kwargs)
+            ok = r.status_code < 400
+        except httpx.HTTPError:
+            r, ok = None, False
+        self.samples[name].append(((time.perf_counter() - start) * 1000, ok))
+        return r
+
+    async def login(self):
+        r = await self.timed("POST /token", "POST", "/token", data={
+            "username": BENCH_EMAIL.format(self.user_id), "password": BENCH_PASSWORD,
+        })
+        if r is not None and r.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    def random_date(self) -> str:
+        d = datetime.date.today() - datetime.timedelta(days=self.rng.randint(0, self.days))
+        return d.isoformat()
+
+    async def step(self, name):
+        uid = {"user_id": self.user_id}
+        if name == "GET /exercise/records":
+            r = await self.timed(name, "GET", "/exercise/records", params={**uid, "date": self.random_date()}, headers=self.headers)
+            if r is not None and r.status_code == 200:
+                self.record_ids = [row["record_id"] for row in r.json()] or self.record_ids
+        elif name == "PATCH /exercise/records/{record_id}":
+            if not self.record_ids:
+                return
+            record_id = self.rng.choice(self.record_ids)
+            await self.timed(name, "PATCH", f"/exercise/records/{record_id}", json={"is_completed": True, "exercise_time": 60}, headers=self.headers)
+        elif name == "GET /exercise/body_composition/weekly":
+            metric = self.rng.choice(["weight", "body_fat"])
+            await self.timed(name, "GET", "/exercise/body_composition/weekly", params={**uid, "metric": metric}, headers=self.headers)
+        elif name == "GET /users/me":
+            await self.timed(name, "GET", "/users/me", headers=self.headers)
+        elif name == "POST /token":
+            await self.login()
+        elif name == "POST /plan/generate-and-save":
+            target = datetime.date.today() + datetime.timedelta(days=1)
+            await self.timed(name, "POST", "/plan/generate-and-save", params={**uid, "date": target.isoformat(), "replace": True}, headers=self.headers)
+
+    async def run(self, stop_at: float):
+        names = [n for n, _ in WORKLOAD]
+        weights = [w for _, w in WORKLOAD]
+        await self.login()
+        while time.perf_counter() < stop_at:
+            await self.step(self.rng.choices(names, weights)[0])
+
+async def run_level(base_url: str, concurrency: int, duration: float, users: int, days: int, seed: int) -> dict:
+    samples = defaultdict(list)
+    rng = random.Random(seed + concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as http:
+        user_ids = rng.sample(range(1, users + 1), k=min(concurrency, users))
+        clients = [Client(http, uid, random.Random(rng.random()), samples, days) for uid in user_ids]
+        start = time.perf_counter()
+        await asyncio.gather(*(c.run(start + duration) for c in clients))
+        elapsed = time.perf_counter() - start
+
+    report = {}
+    for name, values in sorted(samples.items()):
+        latencies = sorted(ms for ms, _ in values)
+        report[name] = {
+            "count": len(values),
+            "errors": sum(1 for _, ok in values if not ok),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+        }
+    return report
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """
+    기준값 대비 p95가 (1+tolerance)배 이상 느려지거나 처리량이 (1-tolerance)배 미만이면 회귀로 판단.
+    """
+    regressions = []
+    for level, endpoints in result["levels"].items():
+        for name, cur in endpoints.items():
+            base = baseline.get("levels", {}).get(level, {}).get(name)
+            if not base:
+                continue
+            if base["p95_ms"] and cur["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(f"c={level} {name}: p95 {base['p95_ms']}ms -> {cur['p95_ms']}ms")
+            if base["throughput_rps"] and cur["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+                regressions.append(f"c={level} {name}: throughput {base['throughput_rps']} -> {cur['throughput_rps']} rps")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="API 부하 벤치마크")
+    parser.add_argument("--database-url", help="벤치마크 DB (기본: 임시 SQLite 파일). 기존 데이터는 삭제됨")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--days", type=int, default=60, help="시드할 운동 기록 기간(일)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=20, help="동시성 단계별 실행 시간(초)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="스텁 LLM 고정 지연")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (기본: stdout)")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--save-baseline", help="이번 결과를 기준값으로 저장")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="capstone-bench-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    print(f"시드 중... ({args.users} users, {args.days} days)", file=sys.stderr)
+    counts = seed_bench_db(database_url, users=args.users, days=args.days, seed=args.seed)
+    print(f"시드 완료: {counts}", file=sys.stderr)
+
+    port = free_port()
+    server = start_server(port, {
+        "DATABASE_URL": database_url,
+        "LLM_BACKEND": "stub",
+        "LLM_STUB_LATENCY_MS": str(args.llm_latency_ms),
+        "EMBED_BACKEND": "stub",
+        "VECTORSTORE_DIR": os.path.join(workdir, "chroma"),
+    })
+
+    result = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "database": database_url.split(":", 1)[0],
+            "seed": counts,
+            "duration_s": args.duration,
+            "llm_latency_ms": args.llm_latency_ms,
+        },
+        "levels": {},
+    }
+    try:
+        for c in args.concurrency:
+            print(f"동시성 {c} 실행 중...", file=sys.stderr)
+            result["levels"][str(c)] = asyncio.run(
+                run_level(f"http://127.0.0.1:{port}", c, args.duration, args.users, args.days, args.seed)
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("기준값 대비 회귀 없음", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# seed.py
+# 벤치마크용 DB 시드. db_work.generate_bulk_data로 사용자/운동 기록/체중·체지방 이력을 대량 삽입.
+# 모든 벤치 사용자의 비밀번호는 BENCH_PASSWORD.
+from sqlalchemy import func, select
+
+from db_work.database import Base, make_engine
+from db_work import models
+from db_work.generate_bulk_data import generate
+
+BENCH_PASSWORD = "bench"
+BENCH_EMAIL = "bench{}@bench.local"
+
+def seed_bench_db(database_url: str, users: int = 200, days: int = 60, seed: int = 42) -> dict:
+    """
+    벤치마크 DB를 새로 만들고 시드. 반환값은 시드 규모.
+    """
+    engine = make_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    generate(engine, users=users, days=days, seed=seed, password=BENCH_PASSWORD, email_pattern=BENCH_EMAIL, verbose=False)
+
+    with engine.connect() as conn:
+        counts = {
+            "users": conn.execute(select(func.count()).select_from(models.User)).scalar(),
+            "exercise_records": conn.execute(select(func.count()).select_from(models.ExerciseRecord)).scalar(),
+            "weight_histories": conn.execute(select(func.count()).select_from(models.WeightHistory)).scalar(),
+        }
+    engine.dispose()
+    return counts
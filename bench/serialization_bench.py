@@ -0,0 +1,88 @@
+# serialization_bench.py
+# 리스트 응답 직렬화 마이크로벤치마크 (DB/HTTP 제외, 직렬화 CPU 비용만 측정).
+#   - pydantic: 행마다 ExerciseRecordOut 생성 → FastAPI response_model 검증/직렬화 → json 인코딩 (기존 경로)
+#   - fast:     행 튜플 → dict → orjson/json bytes (routers.serialization.rows_to_json)
+#
+# 사용 예:
+#   python3 -m bench.serialization_bench --rows 10000 --repeat 20
+import json
+import time
+import random
+import argparse
+import datetime
+from typing import List
+
+from pydantic import TypeAdapter
+
+from routers.exercise import ExerciseRecordOut, RECORD_OUT_FIELDS
+from routers.serialization import rows_to_json, orjson
+
+def make_rows(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    names = ["Squat", "Bench Press", "Deadlift", "Plank", "Lunge", "Pull Up"]
+    start = datetime.date(2025, 1, 1)
+    return [
+        (
+            i + 1,
+            rng.randint(1, len(names)),
+            rng.choice(names),
+            start + datetime.timedelta(days=i // 20),
+            round(rng.uniform(0, 120), 1),
+            rng.randint(5, 15),
+            rng.random() < 0.5,
+        )
+        for i in range(n)
+    ]
+
+def pydantic_path(rows, adapter) -> bytes:
+    # 기존 라우트: 모델 생성 후 FastAPI가 response_model로 재검증 → JSON 호환 dict → json.dumps
+    models = [
+        ExerciseRecordOut(
+            record_id=r[0], exercise_id=r[1], exercise_name=r[2], date=r[3],
+            weight=r[4], reps=r[5], is_completed=r[6],
+        )
+        for r in rows
+    ]
+    validated = adapter.validate_python([m.model_dump() for m in models])
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def fast_path(rows, adapter) -> bytes:
+    return rows_to_json(rows, RECORD_OUT_FIELDS)
+
+def measure(fn, rows, adapter, repeat: int) -> dict:
+    fn(rows, adapter)  # 워밍업
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(rows, adapter)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {"median_ms": round(times[len(times) // 2], 2), "min_ms": round(times[0], 2), "bytes": len(body)}
+
+def main():
+    parser = argparse.ArgumentParser(description="리스트 응답 직렬화 마이크로벤치마크")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.seed)
+    adapter = TypeAdapter(List[ExerciseRecordOut])
+
+    # 두 경로의 결과가 같은지 먼저 확인
+    assert json.loads(pydantic_path(rows, adapter)) == json.loads(fast_path(rows, adapter))
+
+    slow = measure(pydantic_path, rows, adapter, args.repeat)
+    fast = measure(fast_path, rows, adapter, args.repeat)
+    result = {
+        "rows": args.rows,
+        "encoder": "orjson" if orjson is not None else "json",
+        "pydantic": slow,
+        "fast": fast,
+        "speedup": round(slow["median_ms"] / fast["median_ms"], 1) if fast["median_ms"] else None,
+    }
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
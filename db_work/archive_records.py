@@ -0,0 +1,70 @@
+# archive_records.py
+# 보관 기간(horizon)보다 오래된 완료 운동 기록을 exercise_records → exercise_records_archive로 이동.
+# 배치 단위로 INSERT ... SELECT 후 DELETE 하고 배치마다 커밋하여 잠금 시간을 짧게 유지.
+#
+# 사용 예:
+#   python3 -m db_work.archive_records --older-than-days 90 --batch-size 5000
+import os
+import time
+import argparse
+import datetime
+
+from sqlalchemy import select, insert, delete
+
+from .database import engine
+from .models import ExerciseRecord, ExerciseRecordArchive, bump_resource_version
+from .reset_and_seed import get_today_kst
+
+ARCHIVE_HORIZON_DAYS = int(os.getenv("ARCHIVE_HORIZON_DAYS", "90"))
+
+ARCHIVE_COLUMNS = ["id", "user_id", "exercise_id", "date", "sets", "reps", "weight", "exercise_time", "rest_time"]
+
+def archive_batch(conn, cutoff: datetime.date, batch_size: int) -> int:
+    """
+    cutoff 이전의 완료 기록을 최대 batch_size개 이동. 이동한 행 수 반환.
+    """
+    rows = conn.execute(
+        select(ExerciseRecord.id, ExerciseRecord.user_id)
+        .where(ExerciseRecord.is_completed.is_(True), ExerciseRecord.date < cutoff)
+        .order_by(ExerciseRecord.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+    ids = [r[0] for r in rows]
+
+    source = select(*[getattr(ExerciseRecord, c) for c in ARCHIVE_COLUMNS]).where(ExerciseRecord.id.in_(ids))
+    conn.execute(insert(ExerciseRecordArchive).from_select(ARCHIVE_COLUMNS, source))
+    conn.execute(delete(ExerciseRecord).where(ExerciseRecord.id.in_(ids)))
+    # 기록 조회 ETag 무효화 (/records/history 응답의 archived 플래그가 바뀜)
+    for user_id in sorted({r[1] for r in rows}):
+        bump_resource_version(conn, user_id, "records")
+    return len(ids)
+
+def run_archive(older_than_days: int = ARCHIVE_HORIZON_DAYS, batch_size: int = 5000, max_batches: int = None) -> int:
+    cutoff = get_today_kst() - datetime.timedelta(days=older_than_days)
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with engine.begin() as conn:
+            moved = archive_batch(conn, cutoff, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+        print(f"{total}행 이동 (기준일 {cutoff} 이전)")
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="오래된 완료 운동 기록을 보관 테이블로 이동")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_HORIZON_DAYS)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--max-batches", type=int, help="한 번 실행에서 처리할 최대 배치 수")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    total = run_archive(args.older_than_days, args.batch_size, args.max_batches)
+    print(f"보관 완료: {total}행, {time.perf_counter() - start:.1f}초")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# generate_bulk_data.py
+# 규모 테스트용 대량 합성 데이터 생성.
+# N명의 사용자와 수개월치 exercise_records / weight_histories / pbf_histories를
+# 고정 시드로(재현 가능하게) 만들어 청크 단위 multi-row INSERT로 저장.
+#
+# 사용 예:
+#   python3 -m db_work.generate_bulk_data --users 10000 --months 6
+#   python3 -m db_work.generate_bulk_data --users 1000 --months 3 --database-url sqlite:///bulk.db --reset
+import time
+import random
+import argparse
+import datetime
+
+from sqlalchemy import insert, select, func
+from passlib.context import CryptContext
+
+from .database import Base, engine as default_engine, make_engine
+from . import models
+from .reset_and_seed import EXERCISES, get_today_kst
+
+GOALS = ["체중 감량", "근력 향상", "체력 유지", "근비대", "체지방 감소"]
+
+
+class ChunkedInserter:
+    """
+    테이블별 버퍼에 행을 모았다가 chunk_size마다 한 번에 저장.
+    executemany로 넘기면 PyMySQL이 multi-row INSERT (VALUES (...), (...), ...)로 묶어서 전송함.
+    (insert().values(rows)는 행마다 바인드 파라미터를 컴파일하므로 대량 삽입에서는 훨씬 느림)
+    parent_tables(FK 대상)의 버퍼는 다른 테이블보다 항상 먼저 저장.
+    """
+
+    def __init__(self, conn, chunk_size: int, parent_tables=()):
+        self.conn = conn
+        self.chunk_size = chunk_size
+        self.parent_tables = list(parent_tables)
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, table, row: dict) -> None:
+        buf = self.buffers.setdefault(table, [])
+        buf.append(row)
+        if len(buf) >= self.chunk_size:
+            self.flush(table)
+
+    def flush(self, table=None) -> None:
+        tables = [table] if table is not None else list(self.buffers)
+        if any(t not in self.parent_tables for t in tables):
+            tables = self.parent_tables + [t for t in tables if t not in self.parent_tables]
+        for t in tables:
+            buf = self.buffers.get(t)
+            if buf:
+                self.conn.execute(insert(t), buf)
+                self.counts[t.name] = self.counts.get(t.name, 0) + len(buf)
+                self.buffers[t] = []
+
+
+def ensure_exercises(conn) -> list:
+    rows = conn.execute(select(models.Exercise.id, models.Exercise.muscle_group)).all()
+    if not rows:
+        conn.execute(insert(models.Exercise.__table__).values(EXERCISES))
+        rows = conn.execute(select(models.Exercise.id, models.Exercise.muscle_group)).all()
+    return [(r[0], r[1]) for r in rows]
+
+
+def generate_user(rng: random.Random, uid: int, exercises: list, days: int, today: datetime.date,
+                  email_pattern: str, password_hash: str, created_at: datetime.datetime, out: ChunkedInserter) -> None:
+    """
+    한 사용자의 프로필과 days일치 운동/체중/체지방 이력을 생성하여 out에 추가.
+    주당 운동 빈도, 세트/반복 수, 점진적 증량, 체중/체지방 추세를 사용자마다 다르게 둠.
+    """
+    height = round(rng.gauss(170, 8), 1)
+    weight = round(rng.gauss(72, 12), 1)
+    pbf = round(min(40.0, max(8.0, rng.gauss(24, 6))), 1)
+    goal_weight = round(weight - rng.uniform(-3, 10), 1)
+    goal_pbf = round(max(8.0, pbf - rng.uniform(0, 8)), 1)
+
+    sessions_per_week = rng.randint(2, 6)
+    completion_rate = rng.uniform(0.6, 0.98)
+    # 운동별 시작 무게 (자중 운동은 0)
+    base_weight = {eid: (0.0 if rng.random() < 0.3 else float(rng.choice([10, 20, 30, 40, 60]))) for eid, _ in exercises}
+
+    weight_trend = (goal_weight - weight) / max(days, 1) * rng.uniform(0.2, 0.8)
+    pbf_trend = (goal_pbf - pbf) / max(days, 1) * rng.uniform(0.2, 0.8)
+
+    rows = []  # (table, row). 사용자 행을 먼저 넣기 위해 모아 두었다가 마지막에 추가
+    cur_weight, cur_pbf = weight, pbf
+    for back in range(days, -2, -1):  # 내일 플랜까지 생성
+        d = today - datetime.timedelta(days=back)
+        cur_weight += weight_trend + rng.gauss(0, 0.15)
+        cur_pbf += pbf_trend + rng.gauss(0, 0.08)
+
+        if rng.random() < sessions_per_week / 7:
+            progress = 1 + (days - back) / max(days, 1) * 0.25  # 기간 동안 최대 25% 증량
+            completed = back > 0 and rng.random() < completion_rate
+            for eid, _ in rng.sample(exercises, k=min(4, len(exercises))):
+                n_sets = rng.randint(3, 5)
+                reps = rng.choice([6, 8, 10, 12, 15])
+                w = round(base_weight[eid] * progress / 2.5) * 2.5
+                for s in range(1, n_sets + 1):
+                    rows.append((models.ExerciseRecord.__table__, {
+                        "user_id": uid, "exercise_id": eid, "date": d,
+                        "sets": s, "reps": reps, "weight": w,
+                        "exercise_time": rng.randint(30, 90) if completed else None,
+                        "rest_time": rng.choice([60, 90, 120]) if completed else None,
+                        "is_completed": completed,
+                    }))
+
+        # 체중/체지방은 2~4일에 한 번 측정
+        if back >= 0 and rng.random() < 0.35:
+            measured = datetime.datetime.combine(d, datetime.time(rng.randint(6, 22), rng.randint(0, 59)))
+            rows.append((models.WeightHistory.__table__, {"user_id": uid, "weight": round(cur_weight, 1), "created_at": measured}))
+            rows.append((models.PbfHistory.__table__, {"user_id": uid, "body_fat_percentage": round(cur_pbf, 1), "created_at": measured}))
+
+    out.add(models.User.__table__, {
+        "id": uid,
+        "username": f"user{uid}",
+        "email": email_pattern.format(uid),
+        "password": password_hash,
+        "user_goal": rng.choice(GOALS),
+        "recent_state_height": height,
+        "recent_state_weight": round(cur_weight, 1),
+        "recent_state_pbf": round(cur_pbf, 1),
+        "goal_state_height": height,
+        "goal_state_weight": goal_weight,
+        "goal_state_pbf": goal_pbf,
+        "created_at": created_at,
+    })
+    for table, row in rows:
+        out.add(table, row)
+
+
+def generate(
+    engine=None,
+    users: int = 1000,
+    days: int = 180,
+    seed: int = 42,
+    chunk_size: int = 5000,
+    block_size: int = 1000,
+    password: str = "1111",
+    email_pattern: str = "user{}@bulk.local",
+    verbose: bool = True,
+) -> dict:
+    """
+    users명 분량의 데이터를 생성. block_size명 단위로 트랜잭션을 나눔.
+    사용자 id는 기존 최대 id 다음부터 명시적으로 부여하여 INSERT 후 재조회가 필요 없음.
+    """
+    engine = engine or default_engine
+    rng = random.Random(seed)
+    # bcrypt는 느리므로 모든 사용자가 같은 해시를 공유
+    password_hash = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(password)
+    today = get_today_kst()
+    created_at = datetime.datetime.combine(today - datetime.timedelta(days=days), datetime.time(9, 0))
+
+    with engine.begin() as conn:
+        exercises = ensure_exercises(conn)
+        first_id = (conn.execute(select(func.max(models.User.id))).scalar() or 0) + 1
+
+    counts = {}
+    for block_start in range(0, users, block_size):
+        with engine.begin() as conn:
+            out = ChunkedInserter(conn, chunk_size, parent_tables=[models.User.__table__])
+            for uid in range(first_id + block_start, first_id + min(block_start + block_size, users)):
+                generate_user(rng, uid, exercises, days, today, email_pattern, password_hash, created_at, out)
+            out.flush()
+        for name, n in out.counts.items():
+            counts[name] = counts.get(name, 0) + n
+        if verbose:
+            print(f"{min(block_start + block_size, users)}/{users} 사용자 생성, 누적 {sum(counts.values())}행")
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="규모 테스트용 대량 합성 데이터 생성")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--months", type=float, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="한 번에 INSERT 할 행 수")
+    parser.add_argument("--block-size", type=int, default=1000, help="트랜잭션 하나에 넣을 사용자 수")
+    parser.add_argument("--password", default="1111", help="모든 생성 사용자의 비밀번호")
+    parser.add_argument("--database-url", help="대상 DB (기본: DATABASE_URL)")
+    parser.add_argument("--reset", action="store_true", help="모든 테이블을 삭제 후 재생성")
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url) if args.database_url else default_engine
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    start = time.perf_counter()
+    counts = generate(
+        engine,
+        users=args.users,
+        days=int(args.months * 30),
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        block_size=args.block_size,
+        password=args.password,
+    )
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"완료: {counts} / 총 {total}행, {elapsed:.1f}초 ({total / max(elapsed, 1e-9):.0f}행/초)")
+
+
+if __name__ == "__main__":
+    main()
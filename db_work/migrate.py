@@ -0,0 +1,58 @@
+# migrate.py
+# 기존 DB에 models.py의 새 테이블/인덱스를 추가 (데이터 유지, 여러 번 실행해도 안전).
+# create_all은 이미 있는 테이블에 새 인덱스를 추가하지 않으므로, 배포 전에 이 스크립트를 먼저 실행할 것.
+#   - 없는 테이블: CREATE TABLE (+ 그 테이블의 인덱스)  예) resource_versions, pending_plans, exercise_records_archive
+#   - 있는 테이블에 없는 인덱스: CREATE INDEX          예) ix_exercise_records_user_date
+# 컬럼 변경/삭제는 다루지 않음.
+#
+# 사용 예:
+#   python3 -m db_work.migrate --dry-run   # 실행할 DDL만 출력
+#   python3 -m db_work.migrate
+import argparse
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from .database import Base, engine
+from . import models  # noqa: F401  (Base.metadata에 테이블 등록)
+
+def pending_ddl(conn) -> list:
+    """
+    현재 DB와 models.py를 비교해 실행할 DDL 목록(테이블은 FK 순서대로) 반환.
+    """
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            ddl.append(CreateTable(table))
+            ddl.extend(CreateIndex(index) for index in table.indexes)
+            continue
+        have = {index["name"] for index in inspector.get_indexes(table.name)}
+        ddl.extend(CreateIndex(index) for index in table.indexes if index.name not in have)
+    return ddl
+
+def migrate(dry_run: bool = False) -> list[str]:
+    with engine.begin() as conn:
+        ddl = pending_ddl(conn)
+        statements = [str(stmt.compile(dialect=conn.dialect)).strip() for stmt in ddl]
+        if not dry_run:
+            for stmt in ddl:
+                conn.execute(stmt)
+    return statements
+
+def main():
+    parser = argparse.ArgumentParser(description="기존 DB에 새 테이블/인덱스 추가")
+    parser.add_argument("--dry-run", action="store_true", help="실행하지 않고 DDL만 출력")
+    args = parser.parse_args()
+
+    statements = migrate(args.dry_run)
+    for sql in statements:
+        print(sql + ";")
+    if not statements:
+        print("변경 사항 없음")
+    elif not args.dry_run:
+        print(f"{len(statements)}개 DDL 실행 완료")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Text, ForeignKey, TIMESTAMP, Boolean, event
+from sqlalchemy import Column, Integer, SmallInteger, String, Float, Date, Text, ForeignKey, TIMESTAMP, Boolean, Index, UniqueConstraint, event
 from sqlalchemy.orm import relationship
 from .database import Base
 from sqlalchemy.sql import func
+from sqlalchemy.dialects import mysql, sqlite, postgresql
 
 class User(Base):
     __tablename__ = "users"
@@ -37,6 +38,8 @@ class Exercise(Base):
 
 class ExerciseRecord(Base):
     __tablename__ = "exercise_records"
+    # 대부분의 조회가 (user_id, date) 조건 (일별 기록, 최근 이력)
+    __table_args__ = (Index("ix_exercise_records_user_date", "user_id", "date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -52,6 +55,24 @@ class ExerciseRecord(Base):
     user = relationship("User", back_populates="exercise_records")
     exercise = relationship("Exercise", back_populates="exercise_records")
 
+class ExerciseRecordArchive(Base):
+    """
+    오래된 완료 기록 보관용 테이블 (db_work.archive_records가 exercise_records에서 이동).
+    핫 테이블의 인덱스/버퍼 풀 사용량을 일정하게 유지하기 위해 분리. FK/관계 없이 최소 컬럼만 둠.
+    """
+    __tablename__ = "exercise_records_archive"
+    __table_args__ = (Index("ix_exercise_records_archive_user_date", "user_id", "date"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # 원본 exercise_records.id
+    user_id = Column(Integer, nullable=False)
+    exercise_id = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)
+    sets = Column(SmallInteger)
+    reps = Column(SmallInteger)
+    weight = Column(Float)
+    exercise_time = Column(Integer)  # seconds
+    rest_time = Column(Integer)      # seconds
+
 class BodyComposition(Base):
     __tablename__ = "body_compositions"
 
@@ -96,3 +117,68 @@ def on_pbf_change(target, value, oldvalue, initiator):
     # 값이 변경되었을 때만 기록
     if value is not None and value != oldvalue:
         target.pbf_histories.append(PbfHistory(body_fat_percentage=value))
+
+class PendingPlan(Base):
+    """
+    오프피크 시간에 미리 생성해 둔 다음날 플랜. generate_and_save가 입력이 같을 때 즉시 사용.
+    """
+    __tablename__ = "pending_plans"
+    __table_args__ = (UniqueConstraint("user_id", "target_date", name="uq_pending_plans_user_date"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    target_date = Column(Date, nullable=False)
+    input_hash = Column(String(64), nullable=False)  # 프롬프트 입력(목표/신체 상태/이력/카탈로그) 해시
+    plan_json = Column(Text, nullable=False)          # LLM 원본 출력 (JSON 배열)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+
+class ResourceVersion(Base):
+    """
+    사용자별 리소스 버전. 데이터가 바뀔 때마다 증가하며 GET 응답의 ETag 계산에 사용.
+    resource: "records"(exercise_records/archive), "body"(weight/pbf histories)
+    """
+    __tablename__ = "resource_versions"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    resource = Column(String(32), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+def bump_resource_version(connection, user_id: int, resource: str) -> None:
+    """
+    (user_id, resource) 버전을 1 증가 (없으면 1로 생성). 호출한 트랜잭션과 함께 커밋됨.
+    """
+    table = ResourceVersion.__table__
+    values = {"user_id": user_id, "resource": resource, "version": 1}
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update(version=table.c.version + 1)
+    elif dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.resource],
+            set_={"version": table.c.version + 1},
+        )
+    else:
+        result = connection.execute(
+            table.update()
+            .where(table.c.user_id == user_id, table.c.resource == resource)
+            .values(version=table.c.version + 1)
+        )
+        if result.rowcount:
+            return
+        stmt = table.insert().values(**values)
+    connection.execute(stmt)
+
+# ORM으로 기록/이력이 바뀌면 버전 증가 (Core bulk INSERT/DELETE 경로는 직접 bump_resource_version 호출)
+@event.listens_for(ExerciseRecord, "after_insert")
+@event.listens_for(ExerciseRecord, "after_update")
+@event.listens_for(ExerciseRecord, "after_delete")
+def on_exercise_record_change(mapper, connection, target):
+    bump_resource_version(connection, target.user_id, "records")
+
+@event.listens_for(WeightHistory, "after_insert")
+@event.listens_for(PbfHistory, "after_insert")
+def on_body_history_insert(mapper, connection, target):
+    bump_resource_version(connection, target.user_id, "body")
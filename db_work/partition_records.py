@@ -0,0 +1,115 @@
+# partition_records.py
+# (MySQL 전용, 선택 사항) exercise_records를 월 단위 RANGE 파티션으로 전환/유지보수.
+#
+#   python3 -m db_work.partition_records enable --months-back 24 --months-ahead 3
+#   python3 -m db_work.partition_records maintain --months-ahead 3   # 매월 cron으로 실행
+#
+# 주의: MySQL은 파티션 키가 모든 unique key(PK 포함)에 들어가야 하고, 파티션 테이블에 FK를 둘 수 없음.
+#   enable은 exercise_records의 FK를 제거하고 PK를 (id, date)로 바꾸며 date를 NOT NULL로 변경함.
+#   참조 무결성은 애플리케이션(카탈로그 검증, 인증된 사용자 id)에서 보장.
+import argparse
+import datetime
+
+from sqlalchemy import text
+
+from .database import engine
+
+TABLE = "exercise_records"
+
+def month_start(d: datetime.date) -> datetime.date:
+    return d.replace(day=1)
+
+def add_months(d: datetime.date, n: int) -> datetime.date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return datetime.date(d.year + y, m + 1, 1)
+
+def partition_clause(start: datetime.date, end: datetime.date) -> str:
+    """
+    [start, end) 구간의 월별 파티션 정의. 각 파티션 pYYYYMM은 다음 달 1일 미만.
+    """
+    parts = []
+    cur = start
+    while cur < end:
+        nxt = add_months(cur, 1)
+        parts.append(f"PARTITION p{cur:%Y%m} VALUES LESS THAN (TO_DAYS('{nxt.isoformat()}'))")
+        cur = nxt
+    return ",\n  ".join(parts)
+
+def require_mysql(conn):
+    if conn.dialect.name != "mysql":
+        raise SystemExit(f"파티셔닝은 MySQL에서만 지원합니다 (현재: {conn.dialect.name})")
+
+def enable(months_back: int, months_ahead: int):
+    today = datetime.date.today()
+    with engine.begin() as conn:
+        require_mysql(conn)
+
+        nulls = conn.execute(text(f"SELECT COUNT(*) FROM {TABLE} WHERE date IS NULL")).scalar()
+        if nulls:
+            raise SystemExit(f"date가 NULL인 행이 {nulls}개 있어 파티션 키로 쓸 수 없습니다. 먼저 정리하세요.")
+
+        oldest = conn.execute(text(f"SELECT MIN(date) FROM {TABLE}")).scalar()
+        start = month_start(min(oldest or today, add_months(today, -months_back)))
+        end = add_months(month_start(today), months_ahead + 1)
+
+        fks = [r[0] for r in conn.execute(text(
+            "SELECT CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND CONSTRAINT_TYPE = 'FOREIGN KEY'"
+        ), {"t": TABLE})]
+        for fk in fks:
+            conn.execute(text(f"ALTER TABLE {TABLE} DROP FOREIGN KEY `{fk}`"))
+
+        conn.execute(text(
+            f"ALTER TABLE {TABLE} MODIFY date DATE NOT NULL, DROP PRIMARY KEY, ADD PRIMARY KEY (id, date)"
+        ))
+        conn.execute(text(
+            f"ALTER TABLE {TABLE} PARTITION BY RANGE (TO_DAYS(date)) (\n  "
+            f"{partition_clause(start, end)},\n  PARTITION pmax VALUES LESS THAN MAXVALUE\n)"
+        ))
+    print(f"{TABLE} 파티셔닝 완료: {start} ~ {end} 월별 + pmax (FK {len(fks)}개 제거)")
+
+def maintain(months_ahead: int):
+    """
+    pmax를 나누어 앞으로 months_ahead개월치 파티션이 항상 존재하도록 유지.
+    """
+    today = datetime.date.today()
+    with engine.begin() as conn:
+        require_mysql(conn)
+        names = [r[0] for r in conn.execute(text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND PARTITION_NAME IS NOT NULL"
+        ), {"t": TABLE})]
+        months = sorted(n for n in names if n != "pmax")
+        if not months:
+            raise SystemExit(f"{TABLE}이 파티셔닝되어 있지 않습니다. 먼저 enable을 실행하세요.")
+
+        last = datetime.datetime.strptime(months[-1], "p%Y%m").date()
+        start = add_months(last, 1)
+        end = add_months(month_start(today), months_ahead + 1)
+        if start >= end:
+            print("추가할 파티션이 없습니다.")
+            return
+
+        conn.execute(text(
+            f"ALTER TABLE {TABLE} REORGANIZE PARTITION pmax INTO (\n  "
+            f"{partition_clause(start, end)},\n  PARTITION pmax VALUES LESS THAN MAXVALUE\n)"
+        ))
+    print(f"파티션 추가: {start} ~ {end}")
+
+def main():
+    parser = argparse.ArgumentParser(description="exercise_records 월 단위 파티셔닝 (MySQL)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_enable = sub.add_parser("enable", help="테이블을 월별 RANGE 파티션으로 전환")
+    p_enable.add_argument("--months-back", type=int, default=24)
+    p_enable.add_argument("--months-ahead", type=int, default=3)
+    p_maintain = sub.add_parser("maintain", help="미래 월 파티션 추가")
+    p_maintain.add_argument("--months-ahead", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "enable":
+        enable(args.months_back, args.months_ahead)
+    else:
+        maintain(args.months_ahead)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# pregenerate_plans.py
+# 최근 운동 기록이 있는 활성 사용자의 다음날 플랜을 오프피크 시간에 미리 생성하여 pending_plans에 저장.
+#
+# CLI:  python3 -m db_work.pregenerate_plans --active-days 14 --batch-size 50 --concurrency 4
+# 서버: PLAN_PREGEN_ENABLED=1 이면 main.py가 매일 PLAN_PREGEN_HOUR(KST)시에 실행
+import os
+import asyncio
+import logging
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+
+from .database import SessionLocal
+from .models import User, ExerciseRecord, PendingPlan
+from .reset_and_seed import get_today_kst
+
+PLAN_PREGEN_HOUR = int(os.getenv("PLAN_PREGEN_HOUR", "3"))
+PLAN_PREGEN_ACTIVE_DAYS = int(os.getenv("PLAN_PREGEN_ACTIVE_DAYS", "14"))
+PLAN_PREGEN_BATCH_SIZE = int(os.getenv("PLAN_PREGEN_BATCH_SIZE", "50"))
+PLAN_PREGEN_CONCURRENCY = int(os.getenv("PLAN_PREGEN_CONCURRENCY", "4"))
+
+# 서버 프로세스 안에서도 실행되므로 print 대신 로거 사용 (CLI는 main()에서 콘솔 출력 설정)
+logger = logging.getLogger("capstone.pregen")
+
+def find_active_users(session, active_days: int) -> list[int]:
+    """
+    최근 active_days일 안에 exercise_records가 있는 사용자 id 목록.
+    """
+    since = get_today_kst() - datetime.timedelta(days=active_days)
+    rows = session.execute(
+        select(ExerciseRecord.user_id)
+        .distinct()
+        .where(ExerciseRecord.date >= since)
+        .order_by(ExerciseRecord.user_id)
+    ).all()
+    return [r[0] for r in rows]
+
+def pregenerate_for_user(user_id: int, target_date: datetime.date) -> str:
+    """
+    한 사용자의 target_date 플랜을 생성하여 pending_plans에 저장(upsert).
+    반환값: "generated" | "fresh"(입력이 같은 플랜이 이미 있음) | "planned"(이미 플랜 존재) | "skipped" | "failed"
+    """
+    # routers.llm은 LLM 클라이언트를 생성하므로 실제로 필요할 때 import
+    from routers.llm import (
+        PROMPT, invoke_plan_llm,
+        build_plan_inputs, add_rag_context, plan_input_hash, parse_plan_rows, validate_plan_rows,
+    )
+
+    session = SessionLocal()
+    try:
+        user = session.query(User).filter(User.id == user_id).first()
+        if user is None:
+            return "skipped"
+
+        # 이미 해당 날짜 플랜이 있으면 생성하지 않음
+        has_plan = (
+            session.query(ExerciseRecord.id)
+            .filter(ExerciseRecord.user_id == user_id, ExerciseRecord.date == target_date)
+            .first()
+        )
+        if has_plan:
+            return "planned"
+
+        inputs = build_plan_inputs(session, user, None)
+        input_hash = plan_input_hash(inputs, target_date)
+
+        pending = (
+            session.query(PendingPlan)
+            .filter(PendingPlan.user_id == user_id, PendingPlan.target_date == target_date)
+            .first()
+        )
+        if pending is not None and pending.input_hash == input_hash:
+            return "fresh"
+
+        add_rag_context(inputs, user, None)
+        text = invoke_plan_llm(PROMPT, {**inputs, "date": target_date.isoformat()})
+
+        # 저장 전에 검증해서 요청 시점에 실패할 플랜은 보관하지 않음
+        rows = parse_plan_rows(text)
+        validate_plan_rows(rows, [target_date], inputs["catalog_ids"])
+
+        if pending is None:
+            pending = PendingPlan(user_id=user_id, target_date=target_date)
+            session.add(pending)
+        pending.input_hash = input_hash
+        pending.plan_json = text
+        pending.created_at = datetime.datetime.now()
+        session.commit()
+        return "generated"
+    except Exception:
+        session.rollback()
+        logger.exception("[pregen] user %s 실패", user_id)
+        return "failed"
+    finally:
+        session.close()
+
+def run_pregeneration(
+    target_date: datetime.date = None,
+    active_days: int = PLAN_PREGEN_ACTIVE_DAYS,
+    batch_size: int = PLAN_PREGEN_BATCH_SIZE,
+    concurrency: int = PLAN_PREGEN_CONCURRENCY,
+) -> dict:
+    """
+    활성 사용자를 batch_size 단위로 나누어, 배치마다 최대 concurrency개의 LLM 호출을 동시에 수행.
+    """
+    target_date = target_date or (get_today_kst() + datetime.timedelta(days=1))
+
+    session = SessionLocal()
+    try:
+        user_ids = find_active_users(session, active_days)
+        # 지난 날짜의 미사용 플랜 정리
+        session.query(PendingPlan).filter(PendingPlan.target_date < get_today_kst()).delete(synchronize_session=False)
+        session.commit()
+    finally:
+        session.close()
+
+    stats = {"target_date": target_date.isoformat(), "users": len(user_ids)}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            for result in pool.map(lambda uid: pregenerate_for_user(uid, target_date), batch):
+                stats[result] = stats.get(result, 0) + 1
+            logger.info("[pregen] %d/%d 사용자 처리", min(start + batch_size, len(user_ids)), len(user_ids))
+
+    return stats
+
+def seconds_until_next_run(hour: int) -> float:
+    now = datetime.datetime.now(ZoneInfo("Asia/Seoul"))
+    next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += datetime.timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+async def periodic_pregeneration(hour: int = PLAN_PREGEN_HOUR):
+    """
+    서버 프로세스 안에서 매일 hour시(KST)에 run_pregeneration 실행.
+    LLM 호출은 블로킹이므로 스레드에서 실행하여 이벤트 루프를 막지 않음.
+    """
+    while True:
+        await asyncio.sleep(seconds_until_next_run(hour))
+        try:
+            stats = await asyncio.to_thread(run_pregeneration)
+            logger.info("[pregen] 완료: %s", stats)
+        except Exception:
+            logger.exception("[pregen] 실패")
+
+def main():
+    parser = argparse.ArgumentParser(description="활성 사용자의 다음날 운동 플랜 사전 생성")
+    parser.add_argument("--date", help="대상 날짜 (YYYY-MM-DD, 기본: 내일 KST)")
+    parser.add_argument("--active-days", type=int, default=PLAN_PREGEN_ACTIVE_DAYS)
+    parser.add_argument("--batch-size", type=int, default=PLAN_PREGEN_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=PLAN_PREGEN_CONCURRENCY)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    target_date = datetime.date.fromisoformat(args.date) if args.date else None
+    stats = run_pregeneration(target_date, args.active_days, args.batch_size, args.concurrency)
+    print(f"사전 생성 완료: {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -11,12 +11,26 @@ def get_today_kst():
     return datetime.now(ZoneInfo("Asia/Seoul")).date()
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-password1 = pwd_context.hash("1111")
-password2 = pwd_context.hash("2222")
-password3 = pwd_context.hash("3333")
+
+# 기본 운동종목 (generate_bulk_data에서도 사용)
+EXERCISES = [
+    {"name": "Squat", "description": "Barbell back squat", "muscle_group": "Legs"},
+    {"name": "Push Up", "description": "", "muscle_group": "Chest"},
+    {"name": "Pull Up", "description": "", "muscle_group": "Back"},
+    {"name": "Shoulder Press", "description": "", "muscle_group": "Shoulder"},
+    {"name": "Leg Raise", "description": "", "muscle_group": "abdominals"},
+    {"name": "Dumbbell Deadlift", "description": "", "muscle_group": "Back"},
+    {"name": "Crunch Floor", "description": "", "muscle_group": "abdominals"},
+    {"name": "Elbow To Knee", "description": "", "muscle_group": "abdominals"},
+    {"name": "Pike Pushup", "description": "", "muscle_group": "Shoulder"},
+]
 
 
 def seed_data(session):
+    password1 = pwd_context.hash("1111")
+    password2 = pwd_context.hash("2222")
+    password3 = pwd_context.hash("3333")
+
     # 1) 기본 사용자 (비번은 해시 권장: passlib[bcrypt] 등)
     #    예시로는 편의상 평문 → 실제 운영/공유 저장소에는 절대 평문 금지!
     users = [
@@ -39,17 +53,7 @@ def seed_data(session):
     ]
 
     # 2) 기본 운동종목
-    exercises = [
-        {"name": "Squat", "description": "Barbell back squat", "muscle_group": "Legs"},
-        {"name": "Push Up", "description": "", "muscle_group": "Chest"},
-        {"name": "Pull Up", "description": "", "muscle_group": "Back"},
-        {"name": "Shoulder Press", "description": "", "muscle_group": "Shoulder"},
-        {"name": "Leg Raise", "description": "", "muscle_group": "abdominals"},
-        {"name": "Dumbbell Deadlift", "description": "", "muscle_group": "Back"},
-        {"name": "Crunch Floor", "description": "", "muscle_group": "abdominals"},
-        {"name": "Elbow To Knee", "description": "", "muscle_group": "abdominals"},
-        {"name": "Pike Pushup", "description": "", "muscle_group": "Shoulder"},
-    ]
+    exercises = EXERCISES
 
     # 중복 방지용 헬퍼
     def get_or_create(model, defaults=None, **kwargs):
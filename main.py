@@ -1,3 +1,5 @@
+import os
+import asyncio
 from typing import Union, List, Optional, Annotated
 from db_work import database
 from dotenv import load_dotenv
@@ -10,10 +12,11 @@ from pydantic import BaseModel
 from datetime import date
 from db_work.models import User
 from fastapi import Path
-from routers.auth import router as auth_router, get_current_user, oauth2_scheme
+from routers.auth import router as auth_router, get_current_user, get_current_user_read, oauth2_scheme, read_your_writes_middleware
 from routers.llm import router as llm_router
 from routers.exercise import router as ex_router
 from routers.goal import router as goal_router
+from routers.metrics import router as metrics_router, metrics_middleware, setup_metrics
 
 app = FastAPI()
 
@@ -21,9 +24,23 @@ app.include_router(auth_router)
 app.include_router(llm_router)
 app.include_router(ex_router)
 app.include_router(goal_router)
+app.include_router(metrics_router)
+
+# Prometheus 메트릭 (/metrics): 라우트별 지연시간, DB 풀, LLM/RAG 단계
+setup_metrics()
+app.middleware("http")(metrics_middleware)
+# 복제본 read-your-writes: 쓰기 시각을 쿠키/X-Last-Write 헤더로 주고받아 워커 간에도 유지
+app.middleware("http")(read_your_writes_middleware)
+
+@app.on_event("startup")
+async def start_plan_pregeneration():
+    # 오프피크 플랜 사전 생성 (여러 워커로 띄울 때는 한 프로세스에서만 켜거나 CLI를 cron으로 실행)
+    if os.getenv("PLAN_PREGEN_ENABLED", "0") == "1":
+        from db_work.pregenerate_plans import periodic_pregeneration
+        app.state.pregen_task = asyncio.create_task(periodic_pregeneration())
 
 @app.get("/users/me")
-def read_users_me(current_user: User = Depends(get_current_user)):
+def read_users_me(current_user: User = Depends(get_current_user_read)):
     return {
         "id": current_user.id,
         "username": current_user.username,
@@ -0,0 +1,138 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+from typing import Any, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# hf: HF Inference API / openai: OpenAI 호환 서버(vLLM, llama.cpp 등) / stub: 로컬 결정적 스텁
+LLM_BACKEND = os.getenv("LLM_BACKEND", "hf")
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.2"))
+LLM_MAX_NEW_TOKENS = int(os.getenv("HF_MAX_NEW_TOKENS", "6000"))  # 주간 플랜은 출력이 김
+
+
+def estimate_tokens(text: str) -> int:
+    # 토크나이저 없이 쓰는 대략적인 추정치 (한글/JSON 혼합 기준 약 4자당 1토큰)
+    return max(1, len(text) // 4)
+
+
+class StubPlanChatModel(BaseChatModel):
+    """
+    네트워크 없이 프롬프트의 카탈로그/날짜로 유효한 플랜 JSON을 만드는 결정적 스텁.
+    부하 테스트/프로파일링에서 LLM을 제외한 단계를 측정하기 위함.
+    latency_ms(고정 지연)와 tokens_per_sec(출력 토큰 생성 속도)로 실제 모델의 응답 시간을 흉내냄.
+    """
+
+    latency_ms: float = 0.0
+    tokens_per_sec: float = 0.0  # 0이면 생성 시간 없음
+    seed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-plan"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        content = self._build_plan(prompt)
+
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        delay = self.latency_ms / 1000
+        if self.tokens_per_sec > 0:
+            delay += completion_tokens / self.tokens_per_sec
+        if delay > 0:
+            time.sleep(delay)
+
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _build_plan(self, prompt: str) -> str:
+        # 카탈로그 행: "id | name | muscle_group"
+        catalog_ids = [int(m) for m in re.findall(r"^(\d+) \| ", prompt, flags=re.MULTILINE)]
+        # 날짜: 하루치 "날짜는 반드시 YYYY-MM-DD 사용" / 여러 날 "대상 날짜: YYYY-MM-DD, ..."
+        m = re.search(r"(?:날짜는 반드시|대상 날짜:)([^\n]*)", prompt)
+        dates = re.findall(r"\d{4}-\d{2}-\d{2}", m.group(1)) if m else []
+        if not catalog_ids or not dates:
+            return "[]"
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        rng = random.Random(self.seed ^ int.from_bytes(digest[:8], "big"))
+
+        rows = []
+        for d in dates:
+            picks = rng.sample(catalog_ids, k=min(4, len(catalog_ids)))
+            for exercise_id in picks:
+                n_sets = rng.randint(3, 5)
+                reps = rng.choice([8, 10, 12, 15])
+                weight = rng.choice([0, 0, 10.0, 20.0, 30.0])
+                for s in range(1, n_sets + 1):
+                    rows.append({"exercise_id": exercise_id, "date": d, "sets": s, "reps": reps, "weight": weight})
+        return json.dumps(rows)
+
+
+def build_hf_chat():
+    from langchain_huggingface import HuggingFaceEndpoint, ChatHuggingFace
+
+    hf_ep = HuggingFaceEndpoint(
+        repo_id=os.getenv("HF_REPO_ID", "Qwen/Qwen2.5-7B-Instruct"),
+        task="conversational",
+        temperature=LLM_TEMPERATURE,
+        max_new_tokens=LLM_MAX_NEW_TOKENS,
+    )
+    return ChatHuggingFace(llm=hf_ep)
+
+
+def build_openai_chat():
+    # 자체 호스팅 OpenAI 호환 서버 (vLLM, llama.cpp server, TGI 등)
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        base_url=os.getenv("OPENAI_BASE_URL", "http://localhost:8001/v1"),
+        api_key=os.getenv("OPENAI_API_KEY", "EMPTY"),
+        model=os.getenv("OPENAI_MODEL", "Qwen/Qwen2.5-7B-Instruct"),
+        temperature=LLM_TEMPERATURE,
+        max_tokens=LLM_MAX_NEW_TOKENS,
+        timeout=float(os.getenv("OPENAI_TIMEOUT", "120")),
+    )
+
+
+def build_stub_chat():
+    return StubPlanChatModel(
+        latency_ms=float(os.getenv("LLM_STUB_LATENCY_MS", "0")),
+        tokens_per_sec=float(os.getenv("LLM_STUB_TOKENS_PER_SEC", "0")),
+        seed=int(os.getenv("LLM_STUB_SEED", "0")),
+    )
+
+
+CHAT_BACKENDS = {
+    "hf": build_hf_chat,
+    "openai": build_openai_chat,
+    "stub": build_stub_chat,
+}
+
+
+def get_chat_model(backend: Optional[str] = None) -> BaseChatModel:
+    backend = backend or LLM_BACKEND
+    if backend not in CHAT_BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND: {backend} (choose from {', '.join(CHAT_BACKENDS)})")
+    return CHAT_BACKENDS[backend]()
@@ -1,17 +1,241 @@
 import os
+import time
+import shutil
+import logging
+import datetime
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 
-EMBED_MODEL_NAME = os.getenv("HF_EMBED_MODEL", "BAAI/bge-m3")
+# hf: sentence-transformers(HuggingFaceEmbeddings) / stub: 모델 없이 해시 기반 결정적 벡터 (벤치마크용)
+# onnx: ONNX Runtime (int8 양자화 가능, CPU 서버용). HF_EMBED_MODEL은 export한 모델 디렉토리 (python3 -m rag.export_onnx)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "hf")
+EMBED_MODEL_NAME = os.getenv("HF_EMBED_MODEL", "models/bge-m3-onnx-int8" if EMBED_BACKEND == "onnx" else "BAAI/bge-m3")
+EMBED_NUM_THREADS = int(os.getenv("EMBED_NUM_THREADS", "0"))  # 0: 물리 코어 수
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "16"))
+EMBED_MAX_LENGTH = int(os.getenv("EMBED_MAX_LENGTH", "512"))
 VECTORSTORE_DIR = os.getenv("VECTORSTORE_DIR", "data/chroma_plan")
 
-embeddings = HuggingFaceEmbeddings(model_name=EMBED_MODEL_NAME)
+# ===== 버전별 벡터 인덱스 =====
+# VECTORSTORE_DIR/
+#   versions/<YYYYmmddHHMMSSffffff>/   색인할 때마다 새로 만드는 Chroma 디렉토리
+#   CURRENT                            서빙할 버전 이름 (os.replace로 원자적으로 교체)
+# CURRENT가 없으면 예전 방식대로 VECTORSTORE_DIR 자체를 인덱스로 사용 ("legacy").
+# 서빙 워커는 VECTORSTORE_CHECK_SECONDS마다 CURRENT를 확인해 재시작 없이 새 버전으로 전환하고,
+# 이전 버전은 진행 중인 검색이 모두 끝난 뒤 해제.
+VECTORSTORE_CHECK_SECONDS = float(os.getenv("VECTORSTORE_CHECK_SECONDS", "5"))
+VECTORSTORE_KEEP_VERSIONS = int(os.getenv("VECTORSTORE_KEEP_VERSIONS", "3"))
+RAG_CACHE_SIZE = int(os.getenv("RAG_CACHE_SIZE", "256"))
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+LEGACY_VERSION = "legacy"
 
-def get_vectorstore() -> Chroma:
+logger = logging.getLogger("capstone.rag")
+
+def build_embeddings(backend: str = None, model_name: str = None):
+    backend = backend or EMBED_BACKEND
+    model_name = model_name or EMBED_MODEL_NAME
+    if backend == "stub":
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        return DeterministicFakeEmbedding(size=1024)  # bge-m3와 같은 차원
+    if backend == "onnx":
+        from .onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings(
+            model_name,
+            num_threads=EMBED_NUM_THREADS,
+            batch_size=EMBED_BATCH_SIZE,
+            max_length=EMBED_MAX_LENGTH,
+        )
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+embeddings = build_embeddings()
+
+def open_vectorstore(path: str) -> Chroma:
     return Chroma(
-        persist_directory=VECTORSTORE_DIR,
+        persist_directory=path,
         embedding_function=embeddings,
     )
+
+def version_path(version: str, root: str = VECTORSTORE_DIR) -> str:
+    if version == LEGACY_VERSION:
+        return root
+    return os.path.join(root, VERSIONS_DIR, version)
+
+def read_current_version(root: str = VECTORSTORE_DIR) -> str:
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or LEGACY_VERSION
+    except FileNotFoundError:
+        return LEGACY_VERSION
+
+def create_version(root: str = VECTORSTORE_DIR) -> str:
+    """
+    새 버전 디렉토리를 만들고 버전 이름 반환. publish_version 전까지는 서빙에 쓰이지 않음.
+    """
+    version = datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")
+    os.makedirs(version_path(version, root))
+    return version
+
+def publish_version(version: str, root: str = VECTORSTORE_DIR) -> None:
+    # 임시 파일에 쓴 뒤 rename → 읽는 쪽은 이전/새 버전 중 하나만 봄
+    tmp = os.path.join(root, f".{CURRENT_FILE}.{os.getpid()}")
+    with open(tmp, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+
+def prune_versions(keep: int = VECTORSTORE_KEEP_VERSIONS, root: str = VECTORSTORE_DIR) -> list[str]:
+    """
+    최근 keep개(현재 버전 포함)만 남기고 오래된 버전 디렉토리 삭제. 삭제한 버전 반환.
+    직전 버전을 남겨 두는 이유: 아직 전환하지 않은 워커가 잠시 더 읽을 수 있음.
+    """
+    base = os.path.join(root, VERSIONS_DIR)
+    if not os.path.isdir(base):
+        return []
+    current = read_current_version(root)
+    versions = sorted(os.listdir(base), reverse=True)
+    removed = []
+    for version in versions[keep:]:
+        if version == current:
+            continue
+        shutil.rmtree(os.path.join(base, version), ignore_errors=True)
+        removed.append(version)
+    return removed
+
+
+class LRUCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class IndexHandle:
+    """
+    열려 있는 인덱스 버전 하나. refs는 이 버전으로 진행 중인 검색 수.
+    검색 결과 캐시는 버전별로 두어 전환 후 이전 인덱스 결과가 섞이지 않게 함.
+    """
+
+    def __init__(self, version: str, store: Chroma):
+        self.version = version
+        self.store = store
+        self.refs = 0
+        self.retired = False
+        self.results = LRUCache(RAG_CACHE_SIZE)  # (query, k) → 검색 결과 Document 리스트
+
+    def close(self) -> None:
+        self.store = None
+        self.results.clear()
+
+
+class VectorStoreManager:
+    def __init__(self, root: str = VECTORSTORE_DIR, check_seconds: float = VECTORSTORE_CHECK_SECONDS):
+        self.root = root
+        self.check_seconds = check_seconds
+        self._active = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()  # _active 교체와 refs 증감
+        self._refresh_lock = threading.Lock()  # 버전 확인/새 버전 열기
+        # 질의 임베딩은 인덱스 버전과 무관 → 전환 후에도 그대로 재사용 (전환 직후 임베딩 부하 없음)
+        self.query_vectors = LRUCache(RAG_CACHE_SIZE)
+
+    def _refresh(self) -> None:
+        if self._active is not None and time.monotonic() - self._checked_at < self.check_seconds:
+            return
+        # 확인/열기는 한 스레드만 수행 (같은 버전을 여러 번 열지 않도록).
+        # 이미 서빙 중인 버전이 있으면 다른 스레드는 기다리지 않고 현재 버전으로 검색
+        if not self._refresh_lock.acquire(blocking=self._active is None):
+            return
+        try:
+            now = time.monotonic()
+            if self._active is not None and now - self._checked_at < self.check_seconds:
+                return
+            self._checked_at = now
+            version = read_current_version(self.root)
+            if self._active is not None and self._active.version == version:
+                return
+
+            # 새 버전은 _lock 밖에서 열어 두고 교체만 _lock 안에서 (열기 동안 검색을 막지 않음)
+            try:
+                handle = IndexHandle(version, open_vectorstore(version_path(version, self.root)))
+            except Exception:
+                if self._active is None:
+                    raise
+                logger.exception("vectorstore version %s could not be opened; keeping %s", version, self._active.version)
+                return
+
+            with self._lock:
+                old, self._active = self._active, handle
+                if old is not None:
+                    old.retired = True
+                    if old.refs == 0:
+                        old.close()
+        finally:
+            self._refresh_lock.release()
+        if old is not None:
+            logger.info("vectorstore switched %s -> %s", old.version, version)
+
+    @contextmanager
+    def acquire(self):
+        """
+        현재 버전 핸들을 빌려 검색. 블록이 끝날 때까지 해당 버전은 해제되지 않음.
+        """
+        self._refresh()
+        with self._lock:
+            handle = self._active
+            handle.refs += 1
+        try:
+            yield handle
+        finally:
+            with self._lock:
+                handle.refs -= 1
+                if handle.retired and handle.refs == 0:
+                    handle.close()
+
+    def embed_query(self, query: str) -> list[float]:
+        vector = self.query_vectors.get(query)
+        if vector is None:
+            vector = embeddings.embed_query(query)
+            self.query_vectors.put(query, vector)
+        return vector
+
+    @property
+    def version(self) -> str:
+        self._refresh()
+        return self._active.version
+
+
+vectorstores = VectorStoreManager()
+
+def get_vectorstore() -> Chroma:
+    """
+    현재 서빙 중인 버전의 Chroma. 검색 중 버전 해제를 막으려면 vectorstores.acquire() 사용.
+    """
+    with vectorstores.acquire() as handle:
+        return handle.store
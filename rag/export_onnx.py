@@ -0,0 +1,44 @@
+# export_onnx.py
+# bge-m3(또는 HF_EMBED_MODEL)를 ONNX로 export하고 int8 동적 양자화.
+# pip install "optimum[onnxruntime]" 필요 (export할 때만, 서빙에는 onnxruntime + tokenizers만 필요).
+#
+# 사용 예:
+#   python3 -m rag.export_onnx --output models/bge-m3-onnx-int8
+#   python3 -m rag.export_onnx --output models/bge-m3-onnx --no-quantize
+# 이후 .env: EMBED_BACKEND=onnx, HF_EMBED_MODEL=models/bge-m3-onnx-int8
+import os
+import argparse
+
+QUANTIZATION_TARGETS = ["avx2", "avx512", "avx512_vnni", "arm64"]
+
+def export(model_name: str, output_dir: str, quantize: bool = True, target: str = "avx2") -> str:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)  # tokenizer.json 포함
+    print(f"ONNX export 완료: {output_dir}/model.onnx")
+
+    if not quantize:
+        return os.path.join(output_dir, "model.onnx")
+
+    # 동적 양자화: 가중치 int8, 활성값은 실행 시 양자화 → 보정 데이터 불필요
+    config = getattr(AutoQuantizationConfig, target)(is_static=False, per_channel=False)
+    quantizer = ORTQuantizer.from_pretrained(output_dir, file_name="model.onnx")
+    quantizer.quantize(save_dir=output_dir, quantization_config=config)
+    print(f"int8 양자화 완료: {output_dir}/model_quantized.onnx ({target})")
+    return os.path.join(output_dir, "model_quantized.onnx")
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 모델 ONNX export / int8 양자화")
+    parser.add_argument("--model", default="BAAI/bge-m3")
+    parser.add_argument("--output", default="models/bge-m3-onnx-int8")
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--target", choices=QUANTIZATION_TARGETS, default="avx2", help="양자화 대상 CPU 명령어 집합")
+    args = parser.parse_args()
+    export(args.model, args.output, quantize=not args.no_quantize, target=args.target)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,173 @@
+import os
+import re
+import json
+import zlib
+import argparse
+
+import numpy as np
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import PyPDFLoader
-from .embeddings import get_vectorstore
+from .embeddings import (
+    embeddings, open_vectorstore, version_path, create_version, publish_version, prune_versions,
+    VECTORSTORE_KEEP_VERSIONS,
+)
+
+DEFAULT_PDFS = ["docs/home_training_guide.pdf", "docs/exercise_difficulty_and_substitution.pdf", "docs/program_design_principles.pdf", "docs/body_condition_exercise_modification_guide.pdf", "docs/exercise_physiology_guide.pdf"]
+
+# ===== 유사 중복 chunk 제거 (MinHash + LSH) =====
+# 가이드 문서들끼리 내용이 많이 겹쳐서(운동 대체, 프로그램 설계 등) 검색 top-k가 같은 내용의 반복이 되기 쉬움.
+# 문자 n-gram shingle의 MinHash 서명으로 Jaccard 유사도를 추정하고, LSH 밴딩으로 후보 쌍만 비교하여
+# 임계값 이상인 chunk들을 하나의 대표 chunk로 합침 (출처 메타데이터는 모두 보존).
+DEDUP_THRESHOLD = float(os.getenv("RAG_DEDUP_THRESHOLD", "0.7"))
+SHINGLE_SIZE = 5        # 한국어는 띄어쓰기/조사 변화가 많아 단어 대신 문자 5-gram 사용
+NUM_PERM = 128
+LSH_BANDS = 16          # 16밴드 x 8행 → 추정 Jaccard 약 0.7부터 후보로 잡힘
+
+_HASH_PRIME = 4294967311  # 2^32보다 큰 소수
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 2**31 - 1, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, 2**31 - 1, size=NUM_PERM).astype(np.uint64)
+
+# 검색 다양성 측정용 질의 (build_rag_query와 비슷한 주제)
+PROBE_QUERIES = [
+    "운동 목표: 체지방 감량, 제약사항: 무릎 통증",
+    "운동 목표: 근력 향상, 초보자 주 3회 전신 운동 프로그램",
+    "스쿼트를 할 수 없을 때 대체 운동",
+    "허리 디스크가 있을 때 피해야 할 운동과 대안",
+    "홈트레이닝 맨몸 운동 난이도 조절 방법",
+    "점진적 과부하와 세트/반복 수 설정",
+    "유산소 운동과 근력 운동의 순서",
+    "운동 후 휴식 시간과 회복",
+]
+
+def normalize_text(text: str) -> str:
+    text = text.lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set:
+    text = normalize_text(text)
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+def minhash_signature(shingle_set: set) -> np.ndarray:
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+    # (a*h + b) mod p 를 순열마다 계산해 최솟값 (a < 2^31, h < 2^32 이므로 uint64 overflow 없음)
+    return ((np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _HASH_PRIME).min(axis=1)
+
+def find_duplicate_clusters(texts: list[str], threshold: float = DEDUP_THRESHOLD) -> list[list[int]]:
+    """
+    유사 중복 chunk 묶음(인덱스 리스트) 반환. 중복이 없는 chunk는 길이 1 묶음.
+    """
+    signatures = np.stack([minhash_signature(shingles(t)) for t in texts]) if texts else np.empty((0, NUM_PERM))
+    rows = NUM_PERM // LSH_BANDS
+
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
 
-def index_pdfs(pdf_paths: list[str]):
+    checked = set()
+    for band in range(LSH_BANDS):
+        buckets = {}
+        for i, sig in enumerate(signatures):
+            buckets.setdefault(sig[band * rows:(band + 1) * rows].tobytes(), []).append(i)
+        for members in buckets.values():
+            for a, i in enumerate(members):
+                for j in members[a + 1:]:
+                    if (i, j) in checked or find(i) == find(j):
+                        continue
+                    checked.add((i, j))
+                    # 후보 쌍은 전체 서명으로 Jaccard를 다시 추정해서 확인
+                    if np.mean(signatures[i] == signatures[j]) >= threshold:
+                        parent[find(j)] = find(i)
+
+    clusters = {}
+    for i in range(len(texts)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(clusters.values())
+
+def source_label(doc: Document) -> str:
+    page = doc.metadata.get("page")
+    name = doc.metadata.get("filename") or doc.metadata.get("source", "")
+    return f"{name} p.{page + 1}" if isinstance(page, int) else name
+
+def canonical_index(docs: list[Document], cluster: list[int]) -> int:
+    # 가장 긴(내용이 가장 온전한) chunk, 같으면 먼저 나온 것
+    return max(cluster, key=lambda i: (len(docs[i].page_content), -i))
+
+def merge_cluster(docs: list[Document], cluster: list[int]) -> Document:
+    """
+    묶음의 대표 chunk를 남기고, 모든 출처를 sources에 기록.
+    Chroma 메타데이터는 스칼라만 허용하므로 출처 목록은 "; "로 이은 문자열.
+    """
+    canonical = canonical_index(docs, cluster)
+    sources = []
+    for i in cluster:
+        label = source_label(docs[i])
+        if label not in sources:
+            sources.append(label)
+    metadata = dict(docs[canonical].metadata)
+    metadata["sources"] = "; ".join(sources)
+    metadata["duplicate_count"] = len(cluster) - 1
+    return Document(page_content=docs[canonical].page_content, metadata=metadata)
+
+def dedup_documents(docs: list[Document], threshold: float = DEDUP_THRESHOLD):
+    """
+    (대표 chunk 리스트, 원본 인덱스 묶음 리스트) 반환. 두 리스트의 순서는 같음.
+    """
+    clusters = find_duplicate_clusters([d.page_content for d in docs], threshold)
+    return [merge_cluster(docs, c) for c in clusters], clusters
+
+def index_stats(docs: list[Document]) -> dict:
+    return {"chunks": len(docs), "chars": sum(len(d.page_content) for d in docs)}
+
+def retrieval_diversity(vectors: np.ndarray, cluster_ids: list[int], query_vectors: np.ndarray, k: int = 5) -> dict:
+    """
+    질의별 top-k(코사인)에서
+      distinct_ratio: 서로 다른 내용 묶음 수 / k (1에 가까울수록 중복 없음)
+      mean_pairwise_sim: 결과끼리 평균 코사인 유사도 (낮을수록 다양)
+    의 평균.
+    """
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    query_vectors = query_vectors / np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    distinct, pairwise = [], []
+    for q in query_vectors:
+        top = np.argsort(-(vectors @ q))[:k]
+        distinct.append(len({cluster_ids[i] for i in top}) / len(top))
+        if len(top) > 1:
+            sims = vectors[top] @ vectors[top].T
+            pairwise.append((sims.sum() - len(top)) / (len(top) * (len(top) - 1)))
+    return {
+        "distinct_ratio": round(float(np.mean(distinct)), 3),
+        "mean_pairwise_sim": round(float(np.mean(pairwise)), 3) if pairwise else None,
+    }
+
+def dedup_report(docs: list[Document], clusters: list[list[int]], k: int = 5) -> dict:
+    """
+    중복 제거 전/후 인덱스 크기와 검색 다양성 비교. 원본 chunk를 한 번만 임베딩하고 대표 chunk는 그 벡터를 재사용.
+    """
+    vectors = np.array(embeddings.embed_documents([d.page_content for d in docs]))
+    query_vectors = np.array(embeddings.embed_documents(PROBE_QUERIES))
+    cluster_of = [0] * len(docs)
+    for cid, cluster in enumerate(clusters):
+        for i in cluster:
+            cluster_of[i] = cid
+    canonical = [canonical_index(docs, c) for c in clusters]
+    deduped = [docs[i] for i in canonical]
+    return {
+        "before": {**index_stats(docs), **retrieval_diversity(vectors, cluster_of, query_vectors, k)},
+        "after": {**index_stats(deduped), **retrieval_diversity(vectors[canonical], list(range(len(clusters))), query_vectors, k)},
+        "merged_clusters": sum(1 for c in clusters if len(c) > 1),
+    }
+
+def index_pdfs(pdf_paths: list[str], dedup: bool = True, threshold: float = DEDUP_THRESHOLD, report: bool = False,
+               keep: int = VECTORSTORE_KEEP_VERSIONS) -> str:
     all_docs = []
 
     text_splitter = RecursiveCharacterTextSplitter(
@@ -28,12 +193,32 @@ def index_pdfs(pdf_paths: list[str]):
 
         all_docs.extend(chunk_docs)
 
-    # 벡터 DB에 저장
-    vs = get_vectorstore()
-    vs.add_documents(all_docs)
+    # 유사 중복 chunk 제거
+    docs = all_docs
+    if dedup:
+        docs, clusters = dedup_documents(all_docs, threshold)
+        before, after = index_stats(all_docs), index_stats(docs)
+        print(f"중복 제거: {before['chunks']}개 → {after['chunks']}개 chunk, {before['chars']}자 → {after['chars']}자 (임계값 {threshold})")
+        if report:
+            print(json.dumps(dedup_report(all_docs, clusters), ensure_ascii=False, indent=2))
+
+    # 새 버전 디렉토리에 저장한 뒤 CURRENT를 바꿔 서빙 중인 워커들이 전환하도록 함
+    version = create_version()
+    vs = open_vectorstore(version_path(version))
+    vs.add_documents(docs)
     vs.persist()
+    publish_version(version)
+    removed = prune_versions(keep)
 
-    print(f"총 {len(all_docs)}개의 문서를 벡터 DB에 저장했습니다.")
+    print(f"총 {len(docs)}개의 문서를 벡터 DB 버전 {version}에 저장했습니다." + (f" (이전 버전 {len(removed)}개 삭제)" if removed else ""))
+    return version
 
 if __name__ == "__main__":
-    index_pdfs(["docs/home_training_guide.pdf", "docs/exercise_difficulty_and_substitution.pdf", "docs/program_design_principles.pdf", "docs/body_condition_exercise_modification_guide.pdf", "docs/exercise_physiology_guide.pdf"])
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="PDF 가이드를 벡터 DB에 색인")
+    parser.add_argument("pdfs", nargs="*", default=DEFAULT_PDFS)
+    parser.add_argument("--no-dedup", action="store_true", help="유사 중복 chunk 제거 생략")
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD, help="중복으로 볼 추정 Jaccard 유사도")
+    parser.add_argument("--report", action="store_true", help="중복 제거 전/후 인덱스 크기와 검색 다양성 출력")
+    parser.add_argument("--keep", type=int, default=VECTORSTORE_KEEP_VERSIONS, help="남겨 둘 인덱스 버전 수 (현재 포함)")
+    args = parser.parse_args()
+    index_pdfs(args.pdfs, dedup=not args.no_dedup, threshold=args.threshold, report=args.report, keep=args.keep)
@@ -0,0 +1,76 @@
+import os
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# ONNX Runtime로 bge-m3(dense) 임베딩. CPU 전용 서버에서 sentence-transformers보다 빠르고,
+# int8 양자화 모델(python3 -m rag.export_onnx)을 쓰면 메모리도 1/4 수준.
+# pip install onnxruntime tokenizers 필요.
+#
+# 모델 디렉토리: model_quantized.onnx(없으면 model.onnx) + tokenizer.json
+# bge-m3 dense 벡터 = 마지막 hidden state의 CLS 토큰 → L2 정규화 (sentence-transformers 설정과 동일)
+
+def default_num_threads() -> int:
+    return max(1, (os.cpu_count() or 1) // 2)  # 물리 코어 수 근사 (하이퍼스레딩 제외)
+
+
+class OnnxEmbeddings(Embeddings):
+    def __init__(
+        self,
+        model_dir: str,
+        num_threads: int = 0,
+        batch_size: int = 16,
+        max_length: int = 512,
+        model_file: str = None,
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        if model_file is None:
+            quantized = os.path.join(model_dir, "model_quantized.onnx")
+            model_file = quantized if os.path.exists(quantized) else os.path.join(model_dir, "model.onnx")
+        elif not os.path.isabs(model_file):
+            model_file = os.path.join(model_dir, model_file)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads or default_num_threads()
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_file, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.model_file = model_file
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        pad_token = "<pad>"
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+        self.batch_size = batch_size
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+        }
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(feeds["input_ids"])
+        output = self.session.run(None, feeds)[0]
+        vectors = output[:, 0] if output.ndim == 3 else output  # CLS 풀링 (이미 풀링된 export면 그대로)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        # 길이순으로 묶어 배치 내 padding 최소화 후 원래 순서로 복원
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        result = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._encode([texts[i] for i in batch])):
+                result[i] = vector.tolist()
+        return result
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 from db_work import models, database
@@ -43,6 +44,7 @@ def signup(user_data: UserCreate, db: Session = Depends(database.get_db)):
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    database.mark_user_write(new_user.id)
     return {
         "id": new_user.id,
         "username": new_user.username,
@@ -51,7 +53,8 @@ def signup(user_data: UserCreate, db: Session = Depends(database.get_db)):
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    # 토큰만 검증 (DB 조회 없음)
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
@@ -59,8 +62,61 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    return int(user_id)
+
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+def parse_last_write(value):
+    # "<user_id>:<epoch초>" → (user_id, epoch초), 형식이 다르면 None
+    try:
+        user_id, at = value.split(":", 1)
+        return int(user_id), float(at)
+    except (AttributeError, ValueError):
+        return None
+
+async def read_your_writes_middleware(request: Request, call_next):
+    """
+    쓰기 응답에 쓰기 시각을 쿠키/헤더로 붙이고, 다음 요청이 보낸 값을 get_user_read_db가 보게 함.
+    → 읽기 요청이 다른 워커로 가도 READ_YOUR_WRITES_SECONDS 동안은 primary에서 읽음.
+    """
+    seen = parse_last_write(request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE))
+    state = database.begin_request_writes(seen)
+    response = await call_next(request)
+    if state["wrote"] is not None:
+        value = "%d:%.3f" % state["wrote"]
+        response.headers[LAST_WRITE_HEADER] = value
+        response.set_cookie(
+            LAST_WRITE_COOKIE, value,
+            max_age=math.ceil(database.READ_YOUR_WRITES_SECONDS), httponly=True, samesite="lax",
+        )
+    return response
+
+def get_user_read_db(user_id: int = Depends(get_current_user_id), primary_db: Session = Depends(database.get_db)):
+    """
+    읽기 전용 라우트용 세션 (READ_REPLICA_URL이 있으면 복제본).
+    복제본이 없거나 해당 사용자가 최근 READ_YOUR_WRITES_SECONDS 안에 쓴 적이 있으면
+    요청의 primary 세션(get_db)을 그대로 공유 → 한 요청이 primary 연결을 두 개 잡지 않음.
+    """
+    if database.reads_from_primary(user_id):
+        yield primary_db
+        return
+    db = database.ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_current_user(user_id: int = Depends(get_current_user_id), db: Session = Depends(database.get_db)):
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
     
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
+    return user
+
+async def get_current_user_read(user_id: int = Depends(get_current_user_id), db: Session = Depends(get_user_read_db)):
+    # 읽기 전용 라우트용. 라우트의 get_user_read_db와 같은 세션을 공유함
+    user = db.query(models.User).filter(models.User.id == user_id).first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -0,0 +1,40 @@
+import hashlib
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db_work.models import ResourceVersion
+
+# 조건부 GET 지원. 사용자별 리소스 버전(resource_versions)과 요청 파라미터로 약한 ETag를 만들고,
+# If-None-Match가 일치하면 본 쿼리 없이 304 반환.
+#
+#   etag = make_etag(current_user.id, "records", get_resource_version(db, current_user.id, "records"), date)
+#   if is_not_modified(request, etag):
+#       return not_modified_response(etag)
+#   response.headers["ETag"] = etag
+
+def get_resource_version(db: Session, user_id: int, resource: str) -> int:
+    version = db.execute(
+        select(ResourceVersion.version).where(
+            ResourceVersion.user_id == user_id,
+            ResourceVersion.resource == resource,
+        )
+    ).scalar()
+    return version or 0
+
+def make_etag(user_id: int, resource: str, version: int, *parts) -> str:
+    raw = "|".join(str(p) for p in (user_id, resource, version, *parts))
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]}"'
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # 약한 비교: W/ 접두사 무시
+    target = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == target for tag in header.split(","))
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -1,13 +1,16 @@
 import os, json, datetime, re
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from db_work.models import User, Exercise, ExerciseRecord # 당신의 프로젝트 구조에 맞게 import
+from sqlalchemy import select, func, literal, union_all
+from db_work.models import User, Exercise, ExerciseRecord, ExerciseRecordArchive # 당신의 프로젝트 구조에 맞게 import
 from db_work import database
 from datetime import date
-from routers.auth import get_current_user
+from routers.auth import get_current_user, get_current_user_read, get_user_read_db
+from routers.etag import get_resource_version, make_etag, is_not_modified, not_modified_response
+from routers.serialization import FastJSONResponse, rows_to_json
+from routers.plan_cache import plan_cache
 
 router = APIRouter(prefix="/exercise", tags=["exercise"])
 
@@ -20,39 +23,120 @@ class ExerciseRecordOut(BaseModel):
     reps: int
     is_completed: bool
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
-@router.get("/records", response_model=List[ExerciseRecordOut])
+RECORD_OUT_FIELDS = tuple(ExerciseRecordOut.model_fields)
+
+@router.get("/records", response_model=List[ExerciseRecordOut], response_class=FastJSONResponse)
 def get_exercise_records(
+    request: Request,
     user_id: int, 
     date: date,
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_user_read_db),
+    current_user: User = Depends(get_current_user_read)
 ):
+    # 기록이 바뀌지 않았으면 본 쿼리 없이 304
+    version = get_resource_version(db, current_user.id, "records")
+    etag = make_etag(current_user.id, "records", version, date)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    body = plan_cache.get(current_user.id, date, version)
+    if body is not None:
+        return FastJSONResponse(body, headers={"ETag": etag})
 
-    records = (
-        db.query(ExerciseRecord)
-        .join(Exercise)
-        .filter(
+    # 모델 객체 생성/재검증 없이 행 튜플 → JSON (필드 순서는 ExerciseRecordOut과 동일)
+    # 검증을 거치지 않으므로 NULL 가능 컬럼은 스키마 타입에 맞게 coalesce (weight: 자중 운동은 0, ExerciseRow.weight는 Optional)
+    rows = db.execute(
+        select(
+            ExerciseRecord.id, ExerciseRecord.exercise_id, Exercise.name, ExerciseRecord.date,
+            func.coalesce(ExerciseRecord.weight, 0.0), func.coalesce(ExerciseRecord.reps, 0),
+            func.coalesce(ExerciseRecord.is_completed, False),
+        )
+        .join(Exercise, ExerciseRecord.exercise_id == Exercise.id)
+        .where(
             ExerciseRecord.user_id == current_user.id,
             ExerciseRecord.date == date
         )
-        .all()
-    )
+        .order_by(ExerciseRecord.id)
+    ).all()
+
+    body = rows_to_json(rows, RECORD_OUT_FIELDS)
+    plan_cache.put(current_user.id, date, version, body)
+    return FastJSONResponse(body, headers={"ETag": etag})
+
+class ExerciseRecordHistoryOut(BaseModel):
+    record_id: int
+    exercise_id: int
+    exercise_name: str
+    date: date
+    sets: Optional[int] = None
+    reps: Optional[int] = None
+    weight: Optional[float] = None
+    exercise_time: Optional[int] = None
+    rest_time: Optional[int] = None
+    is_completed: bool
+    archived: bool          # 보관 테이블(exercise_records_archive)에서 읽은 기록인지
+
+HISTORY_OUT_FIELDS = tuple(ExerciseRecordHistoryOut.model_fields)
+
+# 한 번에 조회할 수 있는 최대 기간
+HISTORY_MAX_DAYS = 366
 
-    return [
-        ExerciseRecordOut(
-            record_id=r.id,
-            exercise_id=r.exercise_id,
-            exercise_name=r.exercise.name,
-            date=r.date,
-            weight=r.weight,
-            reps=r.reps,
-            is_completed=r.is_completed
+@router.get("/records/history", response_model=List[ExerciseRecordHistoryOut], response_class=FastJSONResponse)
+def get_exercise_record_history(
+    request: Request,
+    start_date: date,
+    end_date: date,
+    db: Session = Depends(get_user_read_db),
+    current_user: User = Depends(get_current_user_read)
+):
+    """
+    기간 내 운동 기록 조회. 최근 기록(exercise_records)과 보관된 기록(exercise_records_archive)을 합쳐서 반환.
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must be on or after start_date")
+    if (end_date - start_date).days + 1 > HISTORY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"range must be at most {HISTORY_MAX_DAYS} days")
+
+    etag = make_etag(current_user.id, "records", get_resource_version(db, current_user.id, "records"), start_date, end_date)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    # 최근/보관 기록을 UNION ALL 한 번으로 읽어 정렬까지 DB에서 처리 (필드 순서는 ExerciseRecordHistoryOut과 동일)
+    hot = (
+        select(
+            ExerciseRecord.id.label("record_id"), ExerciseRecord.exercise_id, Exercise.name.label("exercise_name"),
+            ExerciseRecord.date, ExerciseRecord.sets, ExerciseRecord.reps, ExerciseRecord.weight,
+            ExerciseRecord.exercise_time, ExerciseRecord.rest_time,
+            func.coalesce(ExerciseRecord.is_completed, False).label("is_completed"),
+            literal(False).label("archived"),
+        )
+        .join(Exercise, ExerciseRecord.exercise_id == Exercise.id)
+        .where(
+            ExerciseRecord.user_id == current_user.id,
+            ExerciseRecord.date.between(start_date, end_date),
+        )
+    )
+    archived = (
+        select(
+            ExerciseRecordArchive.id, ExerciseRecordArchive.exercise_id, Exercise.name,
+            ExerciseRecordArchive.date, ExerciseRecordArchive.sets, ExerciseRecordArchive.reps, ExerciseRecordArchive.weight,
+            ExerciseRecordArchive.exercise_time, ExerciseRecordArchive.rest_time,
+            literal(True), literal(True),
         )
-        for r in records
-    ]
+        .join(Exercise, ExerciseRecordArchive.exercise_id == Exercise.id)
+        .where(
+            ExerciseRecordArchive.user_id == current_user.id,
+            ExerciseRecordArchive.date.between(start_date, end_date),
+        )
+    )
+    merged = union_all(hot, archived).subquery()
+    rows = db.execute(
+        select(*merged.c).order_by(merged.c.date, merged.c.exercise_id, func.coalesce(merged.c.sets, 0))
+    ).all()
+
+    return FastJSONResponse(rows_to_json(rows, HISTORY_OUT_FIELDS), headers={"ETag": etag})
 
 class BodyCompositionPointDto(BaseModel):
     measured_at: date
@@ -64,17 +148,25 @@ class WeeklyBodyCompositionResponse(BaseModel):
 
 @router.get("/body_composition/weekly", response_model=WeeklyBodyCompositionResponse)
 def get_weekly_body_composition(
+    request: Request,
+    response: Response,
     user_id: int,
     metric: str,  # "weight" or "body_fat"
     days: int = 7,
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_user_read_db),
+    current_user: User = Depends(get_current_user_read)
 ):
     from db_work.models import WeightHistory, BodyComposition, PbfHistory
     
     end_date = date.today()
     start_date = end_date - datetime.timedelta(days=days-1)
 
+    # 조회 구간이 오늘 기준이므로 날짜도 ETag에 포함
+    etag = make_etag(current_user.id, "body", get_resource_version(db, current_user.id, "body"), metric, days, end_date)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+
     points = []
 
     if metric == "weight":
@@ -157,7 +249,17 @@ def update_exercise_record(
     for field, value in update_fields.items():
         setattr(record, field, value)
 
+    # flush로 버전을 올린 뒤 같은 트랜잭션 안에서 읽음 → 커밋 후에 읽으면 그 사이 다른 PATCH의 버전일 수 있음
+    db.flush()
+    version = get_resource_version(db, current_user.id, "records")
     db.commit()
     db.refresh(record)
+    database.mark_user_write(current_user.id)
+
+    # 일별 플랜 캐시 write-through (응답에 포함되는 필드만, GET 조회와 같은 값으로 반영)
+    changes = {k: getattr(record, k) for k in update_fields if k in RECORD_OUT_FIELDS}
+    if "is_completed" in changes:
+        changes["is_completed"] = bool(changes["is_completed"])  # GET의 coalesce(is_completed, False)와 동일
+    plan_cache.write_through(current_user.id, record.date, version, record.id, changes)
 
     return {"message": "Exercise record updated successfully", "updated_record": update_fields}
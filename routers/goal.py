@@ -24,6 +24,7 @@ def register_goal(
   user.user_goal = goal
   db.commit()
   db.refresh(user)
+  database.mark_user_write(user.id)
 
   return {"message": "Goal updated", "goal": user.user_goal}
 
@@ -44,6 +45,7 @@ def register_recent_state(
   user.recent_state_pbf = pbf
   db.commit()
   db.refresh(user)
+  database.mark_user_write(user.id)
 
   return {"message": "Recent state updated"}
 
@@ -64,5 +66,6 @@ def register_goal_state(
   user.goal_state_pbf = pbf
   db.commit()
   db.refresh(user)
+  database.mark_user_write(user.id)
 
   return {"message": "Goal state updated"}
\ No newline at end of file
@@ -1,29 +1,27 @@
-import os, json, datetime, re
+import os, json, datetime, re, hashlib
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from pydantic import BaseModel, Field, ValidationError, field_validator
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from db_work.models import User, Exercise, ExerciseRecord # 당신의 프로젝트 구조에 맞게 import
+from sqlalchemy import select, insert, delete
+from db_work.models import User, Exercise, ExerciseRecord, PendingPlan, bump_resource_version # 당신의 프로젝트 구조에 맞게 import
 from db_work import database
-from routers.auth import get_current_user
-from rag.embeddings import get_vectorstore
+from routers.plan_cache import plan_cache
+from routers.auth import get_current_user, get_user_read_db
+from routers.timing import request_timer, span, profile_request
+from rag.embeddings import vectorstores
 
 
-from langchain_huggingface import HuggingFaceEndpoint, ChatHuggingFace
+from rag.chat_models import get_chat_model, estimate_tokens
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 
 router = APIRouter(prefix="/plan", tags=["plan"])
 
-# ===== LLM (HF Inference API) =====
-hf_ep = HuggingFaceEndpoint(
-    repo_id=os.getenv("HF_REPO_ID", "Qwen/Qwen2.5-7B-Instruct"),
-    task="conversational",
-    temperature=0.2,
-    max_new_tokens=3000,
-)
-chat = ChatHuggingFace(llm=hf_ep)
+# ===== LLM (LLM_BACKEND: hf | openai | stub) =====
+chat = get_chat_model()
+
+# 사전 생성 플랜 유효 시간
+PLAN_PREGEN_MAX_AGE_HOURS = float(os.getenv("PLAN_PREGEN_MAX_AGE_HOURS", "36"))
 
 class ExerciseRow(BaseModel):
     exercise_id: int
@@ -33,10 +31,12 @@ class ExerciseRow(BaseModel):
     weight: Optional[float] = None
 
 # ===== 프롬프트 =====
-PROMPT = ChatPromptTemplate.from_template(
-    """당신은 운동 플래너입니다. 사용자 정보를 바탕으로 하루치 운동 계획을 JSON 배열로 생성하세요.
-
-## 출력 형식
+# system 메시지(접두): 역할, 출력 형식, 예시, 구성 규칙, 카탈로그. 카탈로그가 같으면 모든 요청에서 글자 단위로 동일하므로
+#   vLLM prefix caching / llama.cpp prompt cache 같은 서빙 스택이 이 부분을 다시 계산하지 않고 재사용할 수 있음.
+#   카탈로그는 catalog_version(카탈로그 해시)로 구분.
+# human 메시지: 사용자 정보, 이력, 참고 가이드, 대상 날짜 등 요청마다 바뀌는 부분.
+# 주의: 요청별 값은 절대 system 메시지에 넣지 말 것 (접두가 깨져 재사용되지 않음).
+PLAN_EXAMPLE = """## 출력 형식
 반드시 다음과 같은 JSON 배열만 출력하세요:
 [
   {{"exercise_id": 1, "date": "2024-01-15", "sets": 1, "reps": 12, "weight": 20.0}},
@@ -62,17 +62,14 @@ PROMPT = ChatPromptTemplate.from_template(
   {{"exercise_id": 8, "date": "2024-01-15", "sets": 2, "reps": 20, "weight": 5.0}},
   {{"exercise_id": 8, "date": "2024-01-15", "sets": 3, "reps": 20, "weight": 5.0}},
   {{"exercise_id": 8, "date": "2024-01-15", "sets": 4, "reps": 20, "weight": 5.0}}
-]
+]"""
 
-## 운동 구성 규칙
-- 정확히 4가지 다른 운동 선택 (아래 카탈로그의 exercise_id만 사용)
-- 각 운동: 3-5세트 수행
-- sets 필드는 세트 번호 (1부터 시작, 4세트면 sets=1,2,3,4로 4개의 별도 레코드 생성)
-- 같은 운동의 모든 세트는 동일한 reps 사용
-- 날짜는 반드시 {date} 사용
-- weight는 자중 운동이면 0, 기구 운동이면 적절한 무게 설정
+PLAN_CATALOG = """## 허용 운동 카탈로그 (버전 {catalog_version}, 반드시 이 목록의 exercise_id만 사용)
+{catalog_text}
 
-## 사용자 정보
+중요: 오직 JSON 배열만 출력하세요. 코드블록(```), 설명, 기타 텍스트 출력 금지. 출력은 [로 시작하고 ]로 끝나야 합니다."""
+
+PLAN_USER = """## 사용자 정보
 - 목표: {user_goal}
 - 현재 상태: {recent_height}cm, {recent_weight}kg, 체지방 {recent_pbf}%
 - 목표 상태: {goal_height}cm, {goal_weight}kg, 체지방 {goal_pbf}%
@@ -83,15 +80,60 @@ PROMPT = ChatPromptTemplate.from_template(
 
 ## 참고 가이드
 {context}
+"""
 
-중요: 최근 운동 이력과 참고 가이드를 참고하더라도 반드시 서로 다른 4가지 운동을 포함하는 플랜을 생성하여야 한다.
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """당신은 운동 플래너입니다. 사용자 정보를 바탕으로 하루치 운동 계획을 JSON 배열로 생성하세요.
 
-## 허용 운동 카탈로그 (반드시 이 목록의 exercise_id만 사용)
-{catalog_text}
+""" + PLAN_EXAMPLE + """
 
-중요: 오직 JSON 배열만 출력하세요. 코드블록(```), 설명, 기타 텍스트 출력 금지. 출력은 [로 시작하고 ]로 끝나야 합니다.
-"""
-)
+## 운동 구성 규칙
+- 정확히 4가지 다른 운동 선택 (아래 카탈로그의 exercise_id만 사용)
+- 각 운동: 3-5세트 수행
+- sets 필드는 세트 번호 (1부터 시작, 4세트면 sets=1,2,3,4로 4개의 별도 레코드 생성)
+- 같은 운동의 모든 세트는 동일한 reps 사용
+- date는 사용자 메시지에 주어진 날짜 사용
+- weight는 자중 운동이면 0, 기구 운동이면 적절한 무게 설정
+- 최근 운동 이력과 참고 가이드를 참고하더라도 반드시 서로 다른 4가지 운동을 포함
+
+""" + PLAN_CATALOG),
+    ("human", PLAN_USER + """
+## 날짜
+- 날짜는 반드시 {date} 사용
+"""),
+])
+
+PROMPT_RANGE = ChatPromptTemplate.from_messages([
+    ("system", """당신은 운동 플래너입니다. 사용자 정보를 바탕으로 사용자 메시지에 주어진 기간의 주기화된 운동 계획을 하나의 JSON 배열로 생성하세요.
+
+## 출력 형식
+반드시 다음과 같은 JSON 배열만 출력하세요 (모든 날짜의 레코드를 하나의 배열에):
+[
+  {{"exercise_id": 1, "date": "2024-01-15", "sets": 1, "reps": 12, "weight": 20.0}},
+  {{"exercise_id": 1, "date": "2024-01-15", "sets": 2, "reps": 12, "weight": 20.0}},
+  {{"exercise_id": 3, "date": "2024-01-16", "sets": 1, "reps": 10, "weight": 0}},
+  {{"exercise_id": 3, "date": "2024-01-16", "sets": 2, "reps": 10, "weight": 0}}
+]
+
+## 운동 구성 규칙
+- 각 날짜마다 정확히 4가지 다른 운동 선택 (아래 카탈로그의 exercise_id만 사용)
+- 각 운동: 3-5세트 수행
+- sets 필드는 세트 번호 (1부터 시작, 4세트면 sets=1,2,3,4로 4개의 별도 레코드 생성)
+- 같은 날 같은 운동의 모든 세트는 동일한 reps 사용
+- date는 사용자 메시지에 주어진 날짜 중 하나 사용
+- weight는 자중 운동이면 0, 기구 운동이면 적절한 무게 설정
+
+## 주기화 규칙
+- 연속된 날짜에 같은 주 근육군(muscle_group)을 반복하지 말고 부위를 분할하여 회복 시간을 확보
+- 기간 전체에 걸쳐 볼륨/강도를 점진적으로 증가시키되, 마지막 날은 강도를 약간 낮춤
+
+""" + PLAN_CATALOG),
+    ("human", PLAN_USER + """
+## 기간
+- {start_date}부터 {end_date}까지 {days}일
+- 대상 날짜: {dates}
+"""),
+])
 
 def build_exercise_history(
     db: Session,
@@ -124,9 +166,18 @@ def build_exercise_history(
     
     
 def build_rag_context(query: str, k: int = 5) -> str:
-    vs = get_vectorstore()
     try:
-        docs = vs.similarity_search(query, k=k)
+        # 검색이 끝날 때까지 현재 인덱스 버전을 붙잡아 둠 (색인 중 버전이 바뀌어도 안전)
+        with vectorstores.acquire() as index:
+            docs = index.results.get((query, k))
+            if docs is None:
+                # 임베딩과 검색을 나누어 각각 시간 측정
+                with span("embed"):
+                    vector = vectorstores.embed_query(query)
+                with span("retrieve") as s:
+                    docs = index.store.similarity_search_by_vector(vector, k=k)
+                    s["chunks"] = len(docs)
+                index.results.put((query, k), docs)
     except Exception:
         return ""
 
@@ -142,16 +193,20 @@ def build_rag_context(query: str, k: int = 5) -> str:
     return "\n".join(chunks)
 
 
-def build_catalog_text(db: Session) -> str:
+def build_catalog(db: Session) -> tuple[str, frozenset]:
     """
     Exercise 테이블에서 LLM이 고를 수 있는 운동 목록을 'id | name | alias들' 형태로 제공
-    LLM은 오직 여기 있는 id만 사용하게 됨.
+    LLM은 오직 여기 있는 id만 사용하게 됨. (카탈로그 텍스트, id 집합) 반환 — id 집합은 응답 검증용.
     """
     rows = db.execute(select(Exercise.id, Exercise.name, Exercise.muscle_group)).all()
     # 필요하면 muscle_group, equipment, 별칭 등 추가
     lines = [f"{r.id} | {r.name} | {r.muscle_group}" for r in rows]
     # 너무 길면 상위 N개, 또는 조건 필터링(헬스장/홈트 등)
-    return "\n".join(lines)
+    return "\n".join(lines), frozenset(r.id for r in rows)
+
+def catalog_version(catalog_text: str) -> str:
+    # 카탈로그 내용 해시. 카탈로그가 바뀔 때만 프롬프트 접두(system 메시지)가 바뀜
+    return hashlib.sha256(catalog_text.encode("utf-8")).hexdigest()[:12]
 
 def extract_json_array(text: str) -> str:
     # 코드블록 제거
@@ -218,38 +273,123 @@ def normalize_list_of_dicts(obj):
         norm.append(item)
     return norm
 
-@router.post("/generate-and-save")
-def generate_and_save(
-    user_id: int,
-    date: str,
-    constraints: Optional[str] = None,
-    db: Session = Depends(database.get_db),
-    current_user: User = Depends(get_current_user)
-):
-    # 0) 유저 정보 조회
-    user = db.query(User).filter(User.id == current_user.id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # 1) 카탈로그 생성 (이름→ID 매핑을 LLM에 알려주기 위함)
-    catalog_text = build_catalog_text(db)
-    if not catalog_text.strip():
-        raise HTTPException(status_code=400, detail="Exercise catalog is empty.")
-
-    history = build_exercise_history(db, user_id=current_user.id)
+def delete_pending_records(db: Session, user_id: int, dates: List[datetime.date]) -> int:
+    """
+    (user, date)의 아직 완료되지 않은 레코드 삭제. 커밋은 호출자가 담당.
+    """
+    result = db.execute(
+        delete(ExerciseRecord)
+        .where(
+            ExerciseRecord.user_id == user_id,
+            ExerciseRecord.date.in_(dates),
+            ExerciseRecord.is_completed.isnot(True),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
 
-    rag_query = (
+def insert_plan_records(db: Session, user_id: int, rows: List[ExerciseRow]):
+    """
+    플랜 레코드를 multi-row INSERT 한 번으로 저장하고, 생성된 레코드(id 포함)를 반환.
+    커밋은 호출자가 담당.
+    """
+    if not rows:
+        return []
+
+    values = [
+        {
+            "user_id": user_id,
+            "exercise_id": r.exercise_id,
+            "date": r.date,
+            "sets": r.sets,        # 세트 '개수'가 아니라 '몇 번째 세트'인지
+            "reps": r.reps,
+            "weight": r.weight,
+            "is_completed": False,
+        }
+        for r in rows
+    ]
+    columns = (
+        ExerciseRecord.id,
+        ExerciseRecord.exercise_id,
+        ExerciseRecord.date,
+        ExerciseRecord.sets,
+        ExerciseRecord.reps,
+        ExerciseRecord.weight,
+    )
+    stmt = insert(ExerciseRecord).values(values)
+
+    # RETURNING 지원 DB(MariaDB, PostgreSQL, SQLite)는 INSERT 결과에서 바로 id를 받음
+    if db.get_bind().dialect.insert_returning:
+        return db.execute(stmt.returning(*columns)).all()
+
+    # MySQL: multi-row INSERT의 lastrowid는 첫 행 id이고, 단일 문장의 auto-increment 값은 보통 연속적으로 할당됨
+    result = db.execute(stmt)
+    first_id = result.lastrowid
+    saved = db.execute(
+        select(*columns)
+        .where(
+            ExerciseRecord.id >= first_id,
+            ExerciseRecord.id < first_id + len(values),
+            ExerciseRecord.user_id == user_id,
+        )
+        .order_by(ExerciseRecord.id)
+    ).all()
+    if len(saved) == len(values):
+        return saved
+
+    # innodb_autoinc_lock_mode=2(interleaved) 등으로 id가 연속적이지 않은 경우:
+    # 같은 트랜잭션 안에서 이번에 넣은 날짜의 미완료 레코드(first_id 이후)를 다시 조회
+    saved = db.execute(
+        select(*columns)
+        .where(
+            ExerciseRecord.user_id == user_id,
+            ExerciseRecord.date.in_({r.date for r in rows}),
+            ExerciseRecord.is_completed.isnot(True),
+            ExerciseRecord.id >= first_id,
+        )
+        .order_by(ExerciseRecord.id)
+    ).all()
+    if len(saved) != len(values):
+        raise HTTPException(
+            status_code=500,
+            detail=f"Inserted {len(values)} records but found {len(saved)}",
+        )
+    return saved
+
+def saved_record_to_dict(r) -> dict:
+    return {
+        "record_id": r.id,
+        "exercise_id": r.exercise_id,
+        "date": r.date,
+        "sets": r.sets,
+        "reps": r.reps,
+        "weight": r.weight,
+    }
+
+def build_rag_query(user: User, constraints: Optional[str]) -> str:
+    return (
         f"운동 목표: {user.user_goal or 'General Fitness'}, "
         f"현재 상태: {user.recent_state_height or 0}cm, {user.recent_state_weight or 0}kg, PBF {user.recent_state_pbf or 0}%, "
         f"목표 상태: {user.goal_state_height or 0}cm, {user.goal_state_weight or 0}kg, PBF {user.goal_state_pbf or 0}%, "
         f"제약사항: {constraints or (user.constraints if hasattr(user, 'constraints') else 'None')}"
     )
-    rag_context = build_rag_context(rag_query, k=5)
 
-    chain = PROMPT | chat | StrOutputParser()
+def build_plan_inputs(db: Session, user: User, constraints: Optional[str]) -> dict:
+    """
+    날짜와 무관한 프롬프트 입력(사용자 정보, 카탈로그, 운동 이력)을 한 번에 생성.
+    하루치/여러 날 플랜 모두 이 결과를 재사용. RAG 컨텍스트는 add_rag_context로 따로 추가
+    (미리 생성된 플랜을 쓰는 경우 검색을 건너뛰기 위함).
+    """
+    # 카탈로그 생성 (이름→ID 매핑을 LLM에 알려주기 위함)
+    with span("catalog"):
+        catalog_text, catalog_ids = build_catalog(db)
+    if not catalog_text.strip():
+        raise HTTPException(status_code=400, detail="Exercise catalog is empty.")
 
-    # 2) LLM 호출
-    text = chain.invoke({
+    with span("history"):
+        history = build_exercise_history(db, user_id=user.id)
+
+    return {
         "user_goal": user.user_goal or "General Fitness",
         "recent_height": user.recent_state_height or 0,
         "recent_weight": user.recent_state_weight or 0,
@@ -258,13 +398,82 @@ def generate_and_save(
         "goal_weight": user.goal_state_weight or 0,
         "goal_pbf": user.goal_state_pbf or 0,
         "constraints": constraints or "None",
-        "date": date,
         "catalog_text": catalog_text,
+        "catalog_version": catalog_version(catalog_text),
         "exercise_history": history,
-        "context": rag_context,
-    })
+        "catalog_ids": catalog_ids,  # 프롬프트/입력 해시에는 쓰이지 않음 (validate_plan_rows용)
+    }
+
+def add_rag_context(inputs: dict, user: User, constraints: Optional[str]) -> dict:
+    inputs["context"] = build_rag_context(build_rag_query(user, constraints), k=5)
+    return inputs
 
-    # 2-1) 빈 응답 가드
+def prompt_token_usage(messages: list, message) -> dict:
+    """
+    요청별 토큰 수. 백엔드가 usage_metadata를 주면 그 값을, 없으면 글자 수 기반 추정치 사용.
+    prefix_tokens: 요청 간 공유되는 system 메시지(접두) 분량. 접두/전체 글자 비율로 프롬프트 토큰을 나눠 계산.
+    """
+    prefix_chars = len(messages[0].content)
+    total_chars = sum(len(m.content) for m in messages)
+    usage = getattr(message, "usage_metadata", None) or {}
+    prompt_tokens = usage.get("input_tokens") or estimate_tokens("".join(m.content for m in messages))
+    completion_tokens = usage.get("output_tokens") or estimate_tokens(str(getattr(message, "content", "")))
+    fraction = prefix_chars / total_chars if total_chars else 0.0
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "prefix_tokens": round(prompt_tokens * fraction),
+        "prefix_fraction": round(fraction, 3),
+    }
+
+def invoke_plan_llm(prompt: ChatPromptTemplate, variables: dict) -> str:
+    """
+    LLM 호출. 프롬프트/완성/공유 접두 토큰 수를 span에 기록 (요청 로그와 /metrics에 반영).
+    """
+    messages = prompt.format_messages(**variables)
+    with span("llm") as s:
+        message = chat.invoke(messages)
+        s.update(prompt_token_usage(messages, message))
+        s["catalog_version"] = variables.get("catalog_version")
+    return getattr(message, "content", message)
+
+def plan_input_hash(inputs: dict, target_date: datetime.date) -> str:
+    """
+    LLM에 들어가는 사용자 입력(목표, 신체 상태, 이력, 카탈로그, 제약사항)과 날짜의 해시.
+    RAG 컨텍스트는 이 입력으로부터 결정되므로 제외. catalog_ids는 catalog_text에 이미 반영되어 있으므로 제외.
+    미리 생성된 플랜이 아직 유효한지(입력이 바뀌지 않았는지) 판단하는 데 사용.
+    """
+    payload = {k: v for k, v in inputs.items() if k not in ("context", "catalog_ids")}
+    payload["date"] = target_date.isoformat()
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def find_pending_plan(db: Session, user_id: int, target_date: datetime.date, input_hash: str) -> Optional[PendingPlan]:
+    """
+    입력 해시가 같고 PLAN_PREGEN_MAX_AGE_HOURS 이내에 생성된 사전 생성 플랜을 조회 (읽기만 함).
+    사용했든 오래되었든 해당 날짜의 사전 생성 플랜은 save_plan이 플랜 저장과 같은 트랜잭션에서 삭제.
+    """
+    pending = (
+        db.query(PendingPlan)
+        .filter(PendingPlan.user_id == user_id, PendingPlan.target_date == target_date)
+        .first()
+    )
+    if pending is None:
+        return None
+
+    max_age = datetime.timedelta(hours=PLAN_PREGEN_MAX_AGE_HOURS)
+    created_at = pending.created_at
+    if created_at.tzinfo is not None:
+        created_at = created_at.replace(tzinfo=None)
+    if pending.input_hash != input_hash or datetime.datetime.now() - created_at > max_age:
+        return None
+    return pending
+
+def parse_plan_rows(text) -> List[ExerciseRow]:
+    """
+    LLM 출력에서 JSON 배열을 추출/파싱하여 ExerciseRow 리스트로 변환.
+    """
+    # 빈 응답 가드
     if not isinstance(text, str):
         # 혹시 메시지 객체 등으로 올 경우 문자열화
         text = getattr(text, "content", "") or str(text)
@@ -272,14 +481,14 @@ def generate_and_save(
     if not text or not text.strip():
         raise HTTPException(status_code=502, detail="LLM returned empty output")
 
-    # 2-2) JSON 배열만 뽑아내기
+    # JSON 배열만 뽑아내기
     clean = extract_json_array(text)
     if not clean:
         # 디버깅용으로 일부만 로그 남기고 에러
         snippet = (text[:300] + "...") if len(text) > 300 else text
         raise HTTPException(status_code=422, detail=f"Invalid LLM JSON: cannot locate top-level array. sample={snippet}")
 
-    # 3) JSON 파싱 + 검증
+    # JSON 파싱 + 검증
     try:
         obj = json.loads(clean)
     except json.JSONDecodeError:
@@ -289,35 +498,184 @@ def generate_and_save(
         except Exception as e2:
             raise HTTPException(status_code=422, detail=f"Invalid LLM JSON: {e2}")
     obj = normalize_list_of_dicts(obj)  # 정규화 추가
-    rows = [ExerciseRow(**item) for item in obj]
+    return [ExerciseRow(**item) for item in obj]
 
-    # 4) exercise_id 유효성(카탈로그 제한) 검증
-    valid_ids = {r[0] for r in db.execute(select(Exercise.id)).all()}
+def validate_plan_rows(rows: List[ExerciseRow], target_dates: List[datetime.date], catalog_ids: frozenset) -> None:
+    """
+    catalog_ids: build_plan_inputs가 프롬프트를 만들 때 읽은 카탈로그 id.
+    LLM 응답 뒤에 DB를 다시 읽지 않으므로 검증에 연결이 필요 없음.
+    """
+    # exercise_id 유효성(카탈로그 제한) 검증
     for r in rows:
-        if r.exercise_id not in valid_ids:
+        if r.exercise_id not in catalog_ids:
             raise HTTPException(status_code=422, detail=f"Unknown exercise_id: {r.exercise_id}")
 
-    # (선택) 날짜 검증
-    target_date = datetime.date.fromisoformat(date)
+    # 날짜 검증 (요청한 날짜/범위 안에 있어야 함)
+    allowed = set(target_dates)
     for r in rows:
-        if r.date != target_date:
-            raise HTTPException(status_code=422, detail=f"date mismatch: {r.date} != {target_date}")
+        if r.date not in allowed:
+            if len(target_dates) == 1:
+                raise HTTPException(status_code=422, detail=f"date mismatch: {r.date} != {target_dates[0]}")
+            raise HTTPException(
+                status_code=422,
+                detail=f"date out of range: {r.date} not in {target_dates[0]}..{target_dates[-1]}",
+            )
+
+    # 모든 대상 날짜에 플랜이 있어야 함 (기간 요청에서 일부 날짜를 빠뜨린 응답 거부)
+    missing = sorted(allowed - {r.date for r in rows})
+    if missing:
+        raise HTTPException(
+            status_code=422,
+            detail=f"missing dates: {', '.join(d.isoformat() for d in missing)}",
+        )
 
-    # 5) DB 저장 (bulk)
+    # 같은 날 같은 운동의 세트 번호 중복 거부
+    seen = set()
+    for r in rows:
+        key = (r.exercise_id, r.date, r.sets)
+        if key in seen:
+            raise HTTPException(
+                status_code=422,
+                detail=f"duplicate set: exercise_id={r.exercise_id} date={r.date} sets={r.sets}",
+            )
+        seen.add(key)
+
+def save_plan(
+    db: Session,
+    user_id: int,
+    rows: List[ExerciseRow],
+    target_dates: List[datetime.date],
+    replace: bool,
+) -> dict:
+    """
+    DB 저장 (bulk, 단일 트랜잭션). replace면 대상 날짜들의 미완료 세트를 먼저 삭제.
+    대상 날짜의 사전 생성 플랜(pending_plans)도 같은 트랜잭션에서 삭제 (저장된 플랜이 생겼으므로 더 이상 쓰지 않음).
+    """
     # sets는 '세트 번호' 그대로 저장
-    new_records = [
-        ExerciseRecord(
-            user_id=user_id,
-            exercise_id=r.exercise_id,
-            date=r.date,
-            sets=r.sets,        # 세트 '개수'가 아니라 '몇 번째 세트'인지
-            reps=r.reps,
-            weight=r.weight,
-            # exercise_time/rest_time/is_completed은 나중에 프론트에서 PATCH
-        )
-        for r in rows
-    ]
-    db.bulk_save_objects(new_records)
-    db.commit()
+    # exercise_time/rest_time/is_completed은 나중에 프론트에서 PATCH
+    try:
+        deleted = 0
+        with span("save") as s:
+            if replace:
+                # 같은 날짜의 미완료 세트만 교체 (완료된 기록은 보존)
+                deleted = delete_pending_records(db, user_id, target_dates)
+            saved = insert_plan_records(db, user_id, rows)
+            s["rows"] = len(saved)
+            db.execute(
+                delete(PendingPlan)
+                .where(PendingPlan.user_id == user_id, PendingPlan.target_date.in_(target_dates))
+                .execution_options(synchronize_session=False)
+            )
+            # Core bulk INSERT/DELETE는 ORM 이벤트를 타지 않으므로 ETag 버전을 직접 증가
+            bump_resource_version(db.connection(), user_id, "records")
+        with span("commit"):
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    database.mark_user_write(user_id)
+    plan_cache.invalidate(user_id, target_dates)
+
+    return {
+        "inserted": len(saved),
+        "deleted": deleted,
+        "records": [saved_record_to_dict(r) for r in saved],
+    }
+
+@router.post("/generate-and-save")
+def generate_and_save(
+    request: Request,
+    response: Response,
+    user_id: int,
+    date: datetime.date,
+    constraints: Optional[str] = None,
+    replace: bool = False,
+    db: Session = Depends(database.get_db),
+    read_db: Session = Depends(get_user_read_db),  # 카탈로그/이력 조회는 복제본
+    current_user: User = Depends(get_current_user)
+):
+    with request_timer("plan.generate") as timer, profile_request(request, response):
+        # 0) 유저 정보 조회
+        user = db.query(User).filter(User.id == current_user.id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        target_date = date
+
+        # 1) 카탈로그/이력
+        inputs = build_plan_inputs(read_db, user, constraints)
+
+        # 2) 입력이 바뀌지 않았으면 미리 생성된 플랜 사용, 아니면 RAG + LLM 호출
+        with span("pregen_lookup") as s:
+            pending = find_pending_plan(db, current_user.id, target_date, plan_input_hash(inputs, target_date))
+            s["hit"] = pending is not None
+
+        # 여기까지 읽기만 했으므로 RAG/LLM 호출 전에 트랜잭션을 끝내고 연결 반납 (저장은 save_plan에서 새 트랜잭션).
+        # commit 대신 close: 이미 읽은 user/pending은 만료되지 않고 분리된 채로 사용 가능 → 다시 조회하지 않음
+        read_db.close()
+        db.close()
+        if pending is not None:
+            text = pending.plan_json
+        else:
+            add_rag_context(inputs, user, constraints)
+            text = invoke_plan_llm(PROMPT, {**inputs, "date": target_date.isoformat()})
+
+        # 3) JSON 파싱 + 검증
+        with span("parse"):
+            rows = parse_plan_rows(text)
+        with span("validate"):
+            validate_plan_rows(rows, [target_date], inputs["catalog_ids"])
+
+        # 4) DB 저장
+        result = save_plan(db, current_user.id, rows, [target_date], replace)
+
+    timer.apply(response)
+    return result
 
-    return {"inserted": len(new_records)}
+@router.post("/generate-range-and-save")
+def generate_range_and_save(
+    request: Request,
+    response: Response,
+    user_id: int,
+    start_date: datetime.date,
+    days: int = Query(7, ge=1, le=14),
+    constraints: Optional[str] = None,
+    replace: bool = False,
+    db: Session = Depends(database.get_db),
+    read_db: Session = Depends(get_user_read_db),  # 카탈로그/이력 조회는 복제본
+    current_user: User = Depends(get_current_user)
+):
+    """
+    start_date부터 days일치 플랜을 LLM 호출 한 번으로 생성하여 저장.
+    카탈로그/이력/RAG 컨텍스트는 한 번만 만들고 모든 날짜가 공유.
+    """
+    with request_timer("plan.generate_range") as timer, profile_request(request, response):
+        user = db.query(User).filter(User.id == current_user.id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        target_dates = [start_date + datetime.timedelta(days=i) for i in range(days)]
+
+        inputs = build_plan_inputs(read_db, user, constraints)
+        # RAG/LLM 호출 동안 풀 연결을 잡고 있지 않도록 읽기 트랜잭션 종료 (generate_and_save 참고)
+        read_db.close()
+        db.close()
+        add_rag_context(inputs, user, constraints)
+
+        text = invoke_plan_llm(PROMPT_RANGE, {
+            **inputs,
+            "start_date": target_dates[0].isoformat(),
+            "end_date": target_dates[-1].isoformat(),
+            "days": days,
+            "dates": ", ".join(d.isoformat() for d in target_dates),
+        })
+
+        with span("parse"):
+            rows = parse_plan_rows(text)
+        with span("validate"):
+            validate_plan_rows(rows, target_dates, inputs["catalog_ids"])
+
+        result = save_plan(db, current_user.id, rows, target_dates, replace)
+
+    timer.apply(response)
+    return result
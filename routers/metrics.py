@@ -0,0 +1,144 @@
+import time
+from fastapi import APIRouter, Request, Response
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+
+from db_work import database
+from routers.timing import add_span_observer
+from routers.plan_cache import plan_cache
+
+router = APIRouter(tags=["metrics"])
+
+# ===== HTTP =====
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+# ===== DB 커넥션 풀 =====
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["pool"])
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Current overflow connections (negative: unused pool slots)", ["pool"])
+POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["pool"])
+POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connection checkouts", ["pool"])
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent acquiring a connection from the pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Pool checkouts that hit DB_POOL_TIMEOUT", ["pool"])
+
+# ===== LLM / RAG =====
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds",
+    "LLM call latency",
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+)
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens", ["kind"])
+EMBED_LATENCY = Histogram(
+    "rag_embed_duration_seconds",
+    "Query embedding latency",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+RETRIEVE_LATENCY = Histogram(
+    "rag_retrieve_duration_seconds",
+    "Vector similarity search latency",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+STAGE_LATENCY = Histogram(
+    "plan_stage_duration_seconds",
+    "Plan generation stage latency",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60),
+)
+
+
+class PlanCacheCollector:
+    """
+    일별 플랜 캐시 통계(plan_cache.stats())를 수집 시점에 노출.
+    """
+
+    def collect(self):
+        stats = plan_cache.stats()
+        requests = CounterMetricFamily("plan_cache_requests", "Day-plan cache lookups", labels=["result"])
+        requests.add_metric(["hit"], stats["hits"])
+        requests.add_metric(["miss"], stats["misses"])
+        yield requests
+        if "entries" in stats:
+            yield GaugeMetricFamily("plan_cache_entries", "Day-plan cache entries", value=stats["entries"])
+            yield GaugeMetricFamily("plan_cache_bytes", "Day-plan cache memory (serialized bytes)", value=stats["bytes"])
+        if "errors" in stats:
+            yield CounterMetricFamily("plan_cache_errors", "Day-plan cache backend errors", value=stats["errors"])
+
+
+def observe_span(name: str, seconds: float, attrs: dict) -> None:
+    STAGE_LATENCY.labels(stage=name).observe(seconds)
+    if name == "llm":
+        LLM_LATENCY.observe(seconds)
+        if attrs.get("prompt_tokens"):
+            LLM_TOKENS.labels(kind="prompt").inc(attrs["prompt_tokens"])
+        if attrs.get("completion_tokens"):
+            LLM_TOKENS.labels(kind="completion").inc(attrs["completion_tokens"])
+        # 공유 접두 비율 = llm_tokens_total{kind="prefix"} / llm_tokens_total{kind="prompt"}
+        if attrs.get("prefix_tokens"):
+            LLM_TOKENS.labels(kind="prefix").inc(attrs["prefix_tokens"])
+    elif name == "embed":
+        EMBED_LATENCY.observe(seconds)
+    elif name == "retrieve":
+        RETRIEVE_LATENCY.observe(seconds)
+
+
+def observe_pool_wait(pool: str, seconds: float, timed_out: bool) -> None:
+    POOL_WAIT.labels(pool=pool).observe(seconds)
+    if timed_out:
+        POOL_TIMEOUTS.labels(pool=pool).inc()
+
+
+def instrument_engine(engine, name: str = "primary") -> None:
+    """
+    엔진의 커넥션 풀 상태를 게이지로 노출하고 checkout 이벤트를 센다.
+    """
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        POOL_CHECKED_OUT.labels(pool=name).set_function(lambda: engine.pool.checkedout())
+    if hasattr(pool, "overflow"):
+        POOL_OVERFLOW.labels(pool=name).set_function(lambda: engine.pool.overflow())
+    if hasattr(pool, "size"):
+        POOL_SIZE.labels(pool=name).set_function(lambda: engine.pool.size())
+
+    checkouts = POOL_CHECKOUTS.labels(pool=name)
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts.inc()
+
+
+def setup_metrics() -> None:
+    add_span_observer(observe_span)
+    database.pool_wait_listeners.append(observe_pool_wait)
+    instrument_engine(database.engine)
+    if database.read_engine is not database.engine:
+        instrument_engine(database.read_engine, "replica")
+    REGISTRY.register(PlanCacheCollector())
+
+
+async def metrics_middleware(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # 경로 파라미터별로 라벨이 늘어나지 않도록 라우트 템플릿(/exercise/records/{record_id})을 사용
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        REQUEST_LATENCY.labels(request.method, path, str(status)).observe(time.perf_counter() - start)
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,253 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from routers.serialization import dumps, loads
+
+# 일별 플랜(GET /exercise/records?date=) 응답 캐시.
+# 키 (user_id, date) → (records 리소스 버전, 직렬화된 JSON bytes).
+# 조회 시 현재 버전과 같을 때만 적중으로 보므로, 어떤 경로로 기록이 바뀌어도(버전 증가) 오래된 응답을 주지 않음.
+#   - PATCH: 캐시된 응답을 직접 고쳐 새 버전으로 다시 저장 (write-through)
+#   - 플랜 저장: 대상 날짜 항목 삭제
+#
+# .env
+#   PLAN_CACHE_BACKEND=memory|redis|off (기본 memory: 워커별 LRU, redis: 워커 간 공유)
+#   PLAN_CACHE_MAX_ENTRIES=10000, PLAN_CACHE_MAX_BYTES=67108864 (memory)
+#   PLAN_CACHE_URL=redis://localhost:6379/0, PLAN_CACHE_TTL=86400 (redis, pip install redis 필요)
+PLAN_CACHE_BACKEND = os.getenv("PLAN_CACHE_BACKEND", "memory")
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "10000"))
+PLAN_CACHE_MAX_BYTES = int(os.getenv("PLAN_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PLAN_CACHE_URL = os.getenv("PLAN_CACHE_URL", "redis://localhost:6379/0")
+PLAN_CACHE_TTL = int(os.getenv("PLAN_CACHE_TTL", "86400"))
+
+
+class PlanCache:
+    """
+    백엔드 공통 동작. 백엔드는 _load/_store/_remove를 구현하고,
+    읽고-고쳐-쓰기를 원자적으로 할 수 있으면 _update도 구현.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, user_id: int, day, version: int) -> Optional[bytes]:
+        entry = self._load(user_id, day)
+        hit = entry is not None and entry[0] == version
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry[1] if hit else None
+
+    def put(self, user_id: int, day, version: int, body: bytes) -> None:
+        self._store(user_id, day, version, body)
+
+    def invalidate(self, user_id: int, days: Iterable) -> None:
+        for day in days:
+            self._remove(user_id, day)
+
+    def write_through(self, user_id: int, day, new_version: int, record_id: int, changes: dict) -> None:
+        """
+        기록 한 건이 수정되어 버전이 new_version이 된 경우, 직전 버전 응답에 변경을 반영해 다시 저장.
+        사이에 다른 쓰기가 있었다면(버전이 하나 이상 차이) 반영하지 않고 삭제.
+        """
+        def apply(entry):
+            if entry[0] != new_version - 1:
+                return None
+            body = entry[1]
+            if changes:
+                rows = loads(body)
+                for row in rows:
+                    if row["record_id"] == record_id:
+                        row.update(changes)
+                body = dumps(rows)
+            return new_version, body
+
+        self._update(user_id, day, apply)
+
+    def _update(self, user_id: int, day, fn: Callable) -> None:
+        """
+        항목이 있으면 fn((version, body))의 결과로 교체 (None이면 삭제). 기본 구현은 원자적이지 않음.
+        """
+        entry = self._load(user_id, day)
+        if entry is None:
+            return
+        new = fn(entry)
+        if new is None:
+            self._remove(user_id, day)
+        else:
+            self._store(user_id, day, *new)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "backend": self.name,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+
+
+class MemoryPlanCache(PlanCache):
+    """
+    워커 프로세스 내 LRU. 항목 수와 총 바이트 수로 제한.
+    """
+    name = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, user_id, day):
+        key = (user_id, str(day))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, user_id, day, version, body):
+        with self._lock:
+            self._store_locked((user_id, str(day)), version, body)
+
+    def _store_locked(self, key, version, body):
+        self._remove_locked(key)
+        if len(body) > self.max_bytes:
+            return
+        self._entries[key] = (version, body)
+        self.bytes += len(body)
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+
+    def _remove(self, user_id, day):
+        with self._lock:
+            self._remove_locked((user_id, str(day)))
+
+    def _remove_locked(self, key):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old[1])
+
+    def _update(self, user_id, day, fn):
+        key = (user_id, str(day))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            new = fn(entry)
+            if new is None:
+                self._remove_locked(key)
+            else:
+                self._store_locked(key, *new)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "entries": len(self._entries), "bytes": self.bytes}
+
+
+class RedisPlanCache(PlanCache):
+    """
+    여러 워커가 공유하는 Redis 백엔드. 값은 b"<version>\\n<body>".
+    Redis 장애 시 캐시 미스로 처리하여 요청은 DB로 진행.
+    """
+    name = "redis"
+
+    def __init__(self, url: str, ttl: int):
+        super().__init__()
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.errors = 0
+
+    @staticmethod
+    def _key(user_id, day) -> str:
+        return f"plan:{user_id}:{day}"
+
+    def _load(self, user_id, day):
+        try:
+            raw = self.client.get(self._key(user_id, day))
+        except Exception:
+            self.errors += 1
+            return None
+        if raw is None:
+            return None
+        version, _, body = raw.partition(b"\n")
+        return int(version), body
+
+    def _store(self, user_id, day, version, body):
+        try:
+            self.client.set(self._key(user_id, day), str(version).encode() + b"\n" + body, ex=self.ttl)
+        except Exception:
+            self.errors += 1
+
+    def _remove(self, user_id, day):
+        try:
+            self.client.delete(self._key(user_id, day))
+        except Exception:
+            self.errors += 1
+
+    def _update(self, user_id, day, fn):
+        # WATCH/MULTI: 읽은 뒤 다른 워커가 같은 키를 바꾸면 EXEC가 실패 → 확인할 수 없으므로 삭제
+        import redis
+
+        key = self._key(user_id, day)
+        try:
+            with self.client.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    if raw is None:
+                        return
+                    version, _, body = raw.partition(b"\n")
+                    new = fn((int(version), body))
+                    pipe.multi()
+                    if new is None:
+                        pipe.delete(key)
+                    else:
+                        pipe.set(key, str(new[0]).encode() + b"\n" + new[1], ex=self.ttl)
+                    pipe.execute()
+                except redis.WatchError:
+                    self.client.delete(key)
+        except Exception:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        return {**super().stats(), "errors": self.errors}
+
+
+class NullPlanCache(PlanCache):
+    name = "off"
+
+    def _load(self, user_id, day):
+        return None
+
+    def _store(self, user_id, day, version, body):
+        pass
+
+    def _remove(self, user_id, day):
+        pass
+
+
+def build_plan_cache(backend: Optional[str] = None) -> PlanCache:
+    backend = backend or PLAN_CACHE_BACKEND
+    if backend == "memory":
+        return MemoryPlanCache(PLAN_CACHE_MAX_ENTRIES, PLAN_CACHE_MAX_BYTES)
+    if backend == "redis":
+        return RedisPlanCache(PLAN_CACHE_URL, PLAN_CACHE_TTL)
+    if backend == "off":
+        return NullPlanCache()
+    raise ValueError(f"Unknown PLAN_CACHE_BACKEND: {backend} (choose from memory, redis, off)")
+
+
+plan_cache = build_plan_cache()
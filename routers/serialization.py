@@ -0,0 +1,45 @@
+import json
+from typing import Iterable, Sequence
+from fastapi.responses import JSONResponse
+
+# 리스트 응답용 빠른 직렬화 경로.
+# SQL 결과 튜플 → dict → JSON bytes 로 바로 인코딩하여 행마다 Pydantic 모델을 만들고
+# response_model로 다시 검증/직렬화하는 비용을 없앰. OpenAPI 스키마는 라우트의 response_model 그대로 유지.
+# 조회 쿼리가 스키마 타입을 그대로 돌려주도록 작성해야 함 (None → coalesce, bool 등).
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    orjson = None
+
+def _default(obj):
+    # date/datetime → ISO 문자열 (orjson은 기본 지원)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+def loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def rows_to_json(rows: Iterable[Sequence], fields: Sequence[str]) -> bytes:
+    """
+    SQL 행 튜플 목록을 [{field: value, ...}, ...] JSON bytes로 변환.
+    """
+    return dumps([dict(zip(fields, row)) for row in rows])
+
+class FastJSONResponse(JSONResponse):
+    """
+    이미 인코딩된 bytes는 그대로, 그 외에는 dumps로 인코딩하는 JSON 응답.
+    JSONResponse를 상속해야 OpenAPI에 response_model 스키마가 표시됨.
+    """
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
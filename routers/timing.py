@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from fastapi import Request, Response
+
+# 요청 단위 구간(span) 시간 측정. 결과는 Server-Timing 헤더와 JSON 로그 한 줄로 출력.
+#
+#   with request_timer("plan.generate") as timer:
+#       with span("catalog"):
+#           ...
+#       with span("retrieve") as s:
+#           s["chunks"] = len(docs)
+#   timer.apply(response)
+
+logger = logging.getLogger("capstone.timing")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))  # 샘플링 간격(초)
+
+_current_timer = contextvars.ContextVar("request_timer", default=None)
+
+# span이 끝날 때마다 호출되는 콜백 (name, seconds, attrs). 메트릭 수집 등에서 등록
+_span_observers: List[Callable[[str, float, dict], None]] = []
+
+
+def add_span_observer(fn: Callable[[str, float, dict], None]) -> None:
+    _span_observers.append(fn)
+
+
+class RequestTimer:
+    def __init__(self, name: str):
+        self.name = name
+        self.spans = []  # [(name, ms, attrs)]
+        self.start = time.perf_counter()
+        self.total_ms = None
+
+    def record(self, name: str, ms: float, attrs: dict) -> None:
+        self.spans.append((name, ms, attrs))
+
+    def server_timing(self) -> str:
+        parts = []
+        for name, ms, attrs in self.spans:
+            part = f"{name};dur={ms:.1f}"
+            if attrs:
+                desc = " ".join(f"{k}={v}" for k, v in attrs.items() if v is not None)
+                part += f';desc="{desc}"'
+            parts.append(part)
+        if self.total_ms is not None:
+            parts.append(f"total;dur={self.total_ms:.1f}")
+        return ", ".join(parts)
+
+    def log(self, status: str) -> None:
+        logger.info(json.dumps({
+            "event": self.name,
+            "status": status,
+            "total_ms": round(self.total_ms or 0, 1),
+            "spans": [{"name": n, "ms": round(ms, 1), **attrs} for n, ms, attrs in self.spans],
+        }, ensure_ascii=False, default=str))
+
+    def apply(self, response: Response) -> None:
+        response.headers["Server-Timing"] = self.server_timing()
+
+
+@contextmanager
+def request_timer(name: str):
+    timer = RequestTimer(name)
+    token = _current_timer.set(timer)
+    status = "ok"
+    try:
+        yield timer
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        timer.total_ms = (time.perf_counter() - timer.start) * 1000
+        _current_timer.reset(token)
+        timer.log(status)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    구간 시간 측정. 진행 중인 request_timer가 없어도 동작(관찰자에게만 전달).
+    yield되는 dict에 토큰 수/청크 수 등 속성을 추가할 수 있음.
+    """
+    start = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        seconds = time.perf_counter() - start
+        timer: Optional[RequestTimer] = _current_timer.get()
+        if timer is not None:
+            timer.record(name, seconds * 1000, attrs)
+        for fn in _span_observers:
+            try:
+                fn(name, seconds, attrs)
+            except Exception:
+                pass
+
+
+@contextmanager
+def profile_request(request: Request, response: Response):
+    """
+    PROFILING_ENABLED=1 이고 요청 헤더에 X-Profile: 1 이 있으면 pyinstrument 샘플링 프로파일러로
+    해당 요청만 프로파일링하여 PROFILE_DIR에 플레임 그래프(HTML)를 저장.
+    """
+    if not (PROFILING_ENABLED and request.headers.get("X-Profile") == "1"):
+        yield
+        return
+
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        logger.warning("X-Profile requested but pyinstrument is not installed")
+        yield
+        return
+
+    profiler = Profiler(interval=PROFILE_INTERVAL)
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        filename = f"{request.url.path.strip('/').replace('/', '_')}-{datetime.now():%Y%m%d-%H%M%S-%f}.html"
+        path = os.path.join(PROFILE_DIR, filename)
+        with open(path, "w") as f:
+            f.write(profiler.output_html())
+        response.headers["X-Profile-Path"] = path